@@ -0,0 +1,480 @@
+"""Benchmarks for one run of invitacion.py and the weight of what it emits.
+
+    python bench_invitacion.py                         # writes bench_results.json
+    python bench_invitacion.py --out new.json --compare bench_results.json
+
+Measures, with streamlit.testing.v1.AppTest:
+  * first / cold / warm script runs (first = first run after the images
+    were prebuilt, cold = memory caches cleared, warm = plain reruns),
+  * RSVP interactions (attendance toggle, form submit),
+  * bytes of every emitted fragment (global CSS, hero, countdown, gallery, ...),
+  * how run time and payload scale with gallery size and image size,
+  * server memory (RSS) as concurrent sessions grow: a real `streamlit run`
+    with N websocket clients connected (Linux only, --memory-sessions).
+
+Every scenario runs against a scratch copy of the app so the real assets/,
+static/ and data/ are never touched. The copy's responsive images are encoded
+before anything is timed (see prebuilt()), so no run races a background encode. Results are JSON so two runs (e.g. two
+commits) can be diffed with --compare.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).parent
+APP = "invitacion.py"
+TIMEOUT = 300
+
+# The bench drives many runs/submits from one process and address; the
+# scratch copy gets buckets that never empty so no scenario times the
+# "too many requests" path instead of the real one.
+UNLIMITED_RATES = (
+    "RATE_LIMITS = {kind: {scope: (1e9, 1e9) for scope in scopes} for kind, scopes in RATE_LIMITS.items()}\n"
+)
+
+
+# =========================================================
+# Helpers
+# =========================================================
+def patch_source(src: str, old: str, new: str) -> str:
+    if old not in src:
+        raise RuntimeError(f"{APP} changed: {old!r} not found, update bench_invitacion.py")
+    return src.replace(old, new, 1)
+
+
+@contextmanager
+def app_copy(gallery: int | None = None, hero_width: int | None = None, serving: str | None = None):
+    """Scratch copy of the app (rate limits off), optionally with `gallery` gallery images,
+    a resized hero or another ASSET_SERVING."""
+    with tempfile.TemporaryDirectory(prefix="inv-bench-") as tmp:
+        tmp = Path(tmp)
+        shutil.copy2(ROOT / APP, tmp / APP)
+        shutil.copytree(ROOT / "assets", tmp / "assets")
+        shutil.copytree(ROOT / "frontend", tmp / "frontend")
+        shutil.copytree(ROOT / ".streamlit", tmp / ".streamlit")
+        assets = tmp / "assets"
+
+        src = (tmp / APP).read_text("utf-8")
+        src = patch_source(src, "\nDUPLICATE_WINDOW = ", "\n" + UNLIMITED_RATES + "DUPLICATE_WINDOW = ")
+        if serving is not None:
+            src = patch_source(src, 'ASSET_SERVING = "static"', f'ASSET_SERVING = "{serving}"')
+        (tmp / APP).write_text(src, "utf-8")
+
+        if gallery is not None:
+            originals = sorted(assets.glob("gallery*.*"))
+            data = [(p.suffix, p.read_bytes()) for p in originals]
+            for p in originals:
+                p.unlink()
+            for i in range(gallery):
+                suffix, blob = data[i % len(data)]
+                (assets / f"gallery{i + 1}{suffix}").write_bytes(blob)
+
+        if hero_width is not None:
+            from PIL import Image
+
+            hero = next(assets.glob("hero.*"))
+            with Image.open(hero) as im:
+                h = round(im.height * hero_width / im.width)
+                im.convert("RGB").resize((hero_width, h)).save(hero, format="JPEG", quality=90)
+
+        yield tmp / APP
+
+
+def load_copy(script: Path):
+    """Import the scratch copy the way its own _app_module() does, so AppTest
+    runs of `script` share this module, its caches and its background jobs."""
+    path = os.path.realpath(script)
+    spec = importlib.util.spec_from_file_location("invitacion", path)
+    inv = importlib.util.module_from_spec(spec)
+    inv._source = (path, os.stat(path).st_mtime_ns)
+    sys.modules["invitacion"] = inv     # dataclasses look their module up here
+    spec.loader.exec_module(inv)
+    return inv
+
+
+def prebuilt(script: Path):
+    """The scratch copy's module, with the default event's images encoded and
+    no background job left running."""
+    inv = sys.modules.get("invitacion")
+    if inv is None or getattr(inv, "_source", (None,))[0] != os.path.realpath(script):
+        inv = load_copy(script)
+    inv._run_singletons.clear()
+    inv.prebuild_images(inv.DEFAULT_EVENT)
+    jobs = inv.background_jobs()
+    while jobs.pending():
+        time.sleep(0.05)
+    return inv
+
+
+def timed_run(at: AppTest) -> float:
+    t0 = time.perf_counter()
+    at.run(timeout=TIMEOUT)
+    dt = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(f"script raised: {at.exception[0].message}")
+    return dt
+
+
+def clear_memory_caches() -> None:
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+def payload(at: AppTest) -> dict[str, int]:
+    """Bytes the run sends as HTML: markdown bodies + iframe documents / component props."""
+    md = sum(len(m.value.encode("utf-8")) for m in at.markdown)
+    frames = sum(len(f.proto.srcdoc.encode("utf-8")) for f in at.get("iframe"))
+    frames += sum(len(c.proto.json_args.encode("utf-8")) for c in at.get("component_instance"))
+    return {"markdown": md, "iframes": frames, "total": md + frames}
+
+
+def summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+        "n": len(samples),
+    }
+
+
+# =========================================================
+# Scenarios
+# =========================================================
+def bench_runs(runs: int) -> dict:
+    with app_copy() as script:
+        clear_memory_caches()
+        prebuilt(script)
+        at = AppTest.from_file(str(script), default_timeout=TIMEOUT)
+        first = timed_run(at)
+
+        cold = []
+        for _ in range(runs):
+            clear_memory_caches()
+            prebuilt(script)    # files are on disk: only registers the results again
+            cold.append(timed_run(AppTest.from_file(str(script), default_timeout=TIMEOUT)))
+
+        warm = [timed_run(at) for _ in range(runs)]
+        return {
+            "first_ms": round(first * 1000, 2),
+            "cold": summary(cold),
+            "warm": summary(warm),
+            "payload_bytes": payload(at),
+        }
+
+
+def bench_rsvp(runs: int) -> dict:
+    with app_copy() as script:
+        prebuilt(script)
+        at = AppTest.from_file(str(script), default_timeout=TIMEOUT)
+        timed_run(at)
+
+        toggle, submit = [], []
+        for i in range(runs):
+            at.selectbox(key="rsvp_asistencia").set_value("Sí" if i % 2 == 0 else "No")
+            toggle.append(timed_run(at))
+
+            at.selectbox(key="rsvp_asistencia").set_value("Sí")
+            timed_run(at)
+            at.text_input(key="rsvp_nombre").input(f"Invitado {i}")
+            at.selectbox(key="rsvp_personas").set_value("2")
+            at.text_area(key="rsvp_comentarios").input("¡Felicidades!")
+            at.button(key="rsvp_confirmar").click()
+            submit.append(timed_run(at))
+            if not any(m.value.startswith("Listo") for m in at.success):
+                raise RuntimeError(f"submit {i + 1} was not accepted: {[w.value for w in at.warning]}")
+        return {"attendance_toggle": summary(toggle), "submit": summary(submit)}
+
+
+def bench_fragments() -> dict[str, int]:
+    """Bytes of each section builder (imported from a scratch copy, so main() doesn't run)."""
+    with app_copy() as script:
+        return _fragment_sizes(prebuilt(script))
+
+
+def _fragment_sizes(inv) -> dict[str, int]:
+    ev = inv.DEFAULT_EVENT
+    builders = {
+        "global_css": lambda: inv.global_css(ev),
+        "client_css": lambda: (inv.FRONTEND_DIR / "invitacion.css").read_text("utf-8"),
+        "client_js": lambda: (inv.FRONTEND_DIR / "invitacion.js").read_text("utf-8"),
+        "hero_html": lambda: inv.hero_html(ev),
+        "intro_html": lambda: inv.intro_html(ev),
+        "countdown_html": lambda: inv.countdown_html(ev),
+        "story_left": lambda: inv.story_html(ev.story_left_img),
+        "story_right": lambda: inv.story_html(ev.story_right_img),
+        "parents_html": lambda: inv.parents_html(ev),
+        "ceremony_html": lambda: inv.ceremony_html(ev),
+        "dress_code_html": lambda: inv.dress_code_html(ev),
+        "gifts_html": lambda: inv.gifts_html(ev),
+        "rsvp_title_html": lambda: inv.rsvp_title_html(ev),
+        "gallery_html": lambda: inv.gallery_html(ev),
+        "footer_html": lambda: inv.footer_html(ev),
+    }
+    return {name: len(fn().encode("utf-8")) for name, fn in builders.items()}
+
+
+def bench_gallery_scaling(sizes: list[int], runs: int) -> list[dict]:
+    out = []
+    for n in sizes:
+        with app_copy(gallery=n) as script:
+            prebuilt(script)
+            at = AppTest.from_file(str(script), default_timeout=TIMEOUT)
+            first = timed_run(at)
+            warm = [timed_run(at) for _ in range(runs)]
+            out.append({
+                "gallery_items": n,
+                "first_ms": round(first * 1000, 2),
+                "warm": summary(warm),
+                "payload_bytes": payload(at),
+            })
+    return out
+
+
+def bench_asset_scaling(widths: list[int], runs: int) -> list[dict]:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return []
+    out = []
+    for w in widths:
+        with app_copy(hero_width=w) as script:
+            hero = next((script.parent / "assets").glob("hero.*"))
+            prebuilt(script)
+            at = AppTest.from_file(str(script), default_timeout=TIMEOUT)
+            first = timed_run(at)
+            warm = [timed_run(at) for _ in range(runs)]
+            out.append({
+                "hero_width": w,
+                "hero_bytes": hero.stat().st_size,
+                "first_ms": round(first * 1000, 2),
+                "warm": summary(warm),
+                "payload_bytes": payload(at),
+            })
+    return out
+
+
+def rss_kb(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+THROTTLED = ("Demasiadas solicitudes", "Vas muy rápido")    # the app's rate-limit warnings
+
+
+async def _open_session(url: str):
+    """Connect like a browser tab and wait for the first run to finish; returns the open socket.
+
+    Raises if the run was turned away by the rate limiter instead of rendering the page.
+    """
+    import websockets
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    ws = await websockets.connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=TIMEOUT)
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    await ws.send(msg.SerializeToString())
+    while True:
+        fwd = ForwardMsg()
+        fwd.ParseFromString(await asyncio.wait_for(ws.recv(), TIMEOUT))
+        kind = fwd.WhichOneof("type")
+        if kind == "delta" and fwd.delta.new_element.WhichOneof("type") == "alert":
+            body = fwd.delta.new_element.alert.body
+            if body.startswith(THROTTLED):
+                await ws.close()
+                raise RuntimeError(f"session was throttled ({body!r}); the measurement would be invalid")
+        if kind == "script_finished":
+            return ws
+
+
+async def _visit(url: str) -> None:
+    await (await _open_session(url)).close()
+
+
+async def _grow_sessions(url: str, pid: int, steps: list[int]) -> list[dict]:
+    sockets, out = [], []
+    sem = asyncio.Semaphore(16)
+
+    async def one():
+        async with sem:
+            return await _open_session(url)
+
+    for n in steps:
+        sockets += await asyncio.gather(*(one() for _ in range(n - len(sockets))))
+        await asyncio.sleep(1.0)    # let run threads and buffers settle
+        out.append({"sessions": n, "rss_kb": rss_kb(pid)})
+    for ws in sockets:
+        await ws.close()
+    return out
+
+
+@contextmanager
+def streamlit_server(script: Path):
+    """`streamlit run script` on a free port; yields (process, ws url)."""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(script), "--server.headless", "true",
+         "--server.port", str(port), "--server.enableXsrfProtection", "false",
+         "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none"],
+        cwd=script.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2)
+                break
+            except OSError:
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError("streamlit did not start")
+                time.sleep(0.3)
+        yield proc, f"ws://127.0.0.1:{port}/_stcore/stream"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def bench_memory(steps: list[int], serving: str) -> dict:
+    """Server RSS with steps[i] concurrent sessions (each has finished one full run).
+
+    The images are encoded (prebuilt()) before the server starts, so no
+    encode runs while RSS is sampled, and one visit pays the server's one-off
+    first-render costs before idle_rss_kb is read. per_session_kb is the
+    slope between the first and the last step: what one more guest costs.
+    """
+    if not Path("/proc/self/status").exists():
+        return {}
+    with app_copy(serving=serving) as script:
+        prebuilt(script)
+        with streamlit_server(script) as (proc, url):
+            asyncio.run(_visit(url))
+            time.sleep(2.0)     # let the (instant) job threads of that run finish
+            idle = rss_kb(proc.pid)
+            points = asyncio.run(_grow_sessions(url, proc.pid, steps))
+
+    first, last = points[0], points[-1]
+    per_session = (last["rss_kb"] - first["rss_kb"]) / max(1, last["sessions"] - first["sessions"])
+    return {
+        "serving": serving,
+        "idle_rss_kb": idle,
+        "points": points,
+        "per_session_kb": round(per_session, 1),
+    }
+
+
+# =========================================================
+# Reporting
+# =========================================================
+def environment() -> dict:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        rev = ""
+    return {
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def flatten(d: dict, prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(flatten(v, key + "."))
+        elif isinstance(v, list):
+            for item in v:
+                tag = next(f"{ik}={iv}" for ik, iv in item.items() if ik in ("gallery_items", "hero_width", "sessions"))
+                flat.update(flatten(item, f"{key}[{tag}]."))
+        elif isinstance(v, (int, float)) and k != "n":
+            flat[key] = v
+    return flat
+
+
+def compare(new: dict, old: dict) -> int:
+    """Print metrics that moved and return how many got worse by more than 10 %."""
+    a, b = flatten(old["results"]), flatten(new["results"])
+    worse = 0
+    print(f"\n{'metric':60} {'old':>12} {'new':>12} {'delta':>8}")
+    for key in sorted(a.keys() & b.keys()):
+        if not a[key]:
+            continue
+        delta = (b[key] - a[key]) / a[key] * 100
+        if abs(delta) < 1:
+            continue
+        flag = " !" if delta > 10 else ""
+        worse += bool(flag)
+        print(f"{key:60} {a[key]:>12} {b[key]:>12} {delta:>+7.1f}%{flag}")
+    return worse
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark invitacion.py run cost and page weight.")
+    ap.add_argument("--out", type=Path, default=ROOT / "bench_results.json")
+    ap.add_argument("--compare", type=Path, help="previous results file to diff against")
+    ap.add_argument("--runs", type=int, default=5, help="repetitions per timing (default: 5)")
+    ap.add_argument("--gallery-sizes", default="0,5,20", help="comma separated (default: 0,5,20)")
+    ap.add_argument("--hero-widths", default="800,1600,3200", help="comma separated (default: 800,1600,3200)")
+    ap.add_argument("--memory-sessions", default="10,100,250,500",
+                    help="concurrent sessions for the memory benchmark, comma separated (default: 10,100,250,500)")
+    ap.add_argument("--quick", action="store_true", help="skip the scaling and memory scenarios")
+    args = ap.parse_args()
+
+    results = {
+        "runs": bench_runs(args.runs),
+        "rsvp": bench_rsvp(args.runs),
+        "fragments_bytes": bench_fragments(),
+    }
+    if not args.quick:
+        results["gallery_scaling"] = bench_gallery_scaling(
+            [int(x) for x in args.gallery_sizes.split(",") if x], args.runs
+        )
+        results["asset_scaling"] = bench_asset_scaling(
+            [int(x) for x in args.hero_widths.split(",") if x], args.runs
+        )
+        steps = sorted(int(x) for x in args.memory_sessions.split(",") if x)
+        results["memory"] = {mode: bench_memory(steps, mode) for mode in ("static", "inline")}
+
+    report = {"env": environment(), "results": results}
+    args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"\nSaved {args.out}")
+
+    if args.compare:
+        old = json.loads(args.compare.read_text(encoding="utf-8"))
+        sys.exit(1 if compare(report, old) else 0)
+
+
+if __name__ == "__main__":
+    main()
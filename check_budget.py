@@ -0,0 +1,282 @@
+"""Check the rendered invitation against a performance budget.
+
+    python check_budget.py [--event SLUG] [--viewport 412] [--dpr 2] [--budget KEY=N ...]
+
+Renders every section the way `streamlit run invitacion.py` does (same
+builders, "static" asset serving), without a browser or a server, and
+reports for each one the HTML it emits, the inline <style>/<script> and
+data: URIs inside it, and the files it makes the browser download. For
+<picture> elements the srcset candidate a phone of --viewport CSS pixels
+at --dpr would pick is charged; every image is also compared with the
+width it is displayed at. Sizes are uncompressed bytes.
+
+"initial" is what the first view needs: everything except the gallery
+slides (fetched as the carousel moves) and the song (preload="none").
+Exits with status 1 and lists the offending figures when a budget is
+exceeded; override any of DEFAULT_BUDGETS with --budget KEY=N.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import unquote
+
+import invitacion as inv
+
+DEFAULT_BUDGETS = {
+    "initial_kb": 1200,     # first view
+    "total_kb": 3000,       # first view + every gallery slide (song excluded)
+    "section_kb": 900,      # any one section: its HTML + the files it references
+    "image_kb": 350,        # any single image as downloaded
+    "audio_kb": 6000,       # the song, first source offered
+    "inline_css_kb": 80,    # <style> blocks, page total
+    "inline_js_kb": 20,     # <script> blocks without src, page total
+    "oversize": 2.0,        # image width / (display width x dpr)
+}
+
+STATIC_REF = re.compile(re.escape(inv.STATIC_URL) + r"/([^\"'?\s)]+)(?:\?v=[0-9a-f]+)?")
+PICTURE = re.compile(r"<picture>(.*?)</picture>", re.S)
+SOURCE = re.compile(r'<source type="image/\w+" sizes="([^"]*)" srcset="([^"]*)"')
+TEMPLATE = re.compile(r"<template>(.*?)</template>", re.S)
+STYLE = re.compile(r"<style[^>]*>(.*?)</style>", re.S | re.I)
+SCRIPT = re.compile(r"<script(?![^>]*\bsrc=)[^>]*>(.*?)</script>", re.S | re.I)
+DATA_URI = re.compile(r"data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+")
+SIZE_PART = re.compile(r"\((max|min)-width:\s*(\d+)px\)\s*(.+)")
+AUDIO_EXTS = (".mp3", ".m4a", ".aac", ".ogg", ".opus", ".webm")
+
+
+# =========================================================
+# Sections
+# Same names and builders as main(); `component` marks the ones rendered
+# in the component iframe, which also receives the font CSS.
+# =========================================================
+SECTIONS: tuple[tuple[str, bool, Callable[[inv.Event], str]], ...] = (
+    ("global_css", False, inv.global_css),
+    ("hero", True, lambda ev: inv.hero_html(ev) if ev.hero_img else ""),
+    ("intro", False, inv.intro_html),
+    ("story_left", False, lambda ev: inv.story_html(ev.story_left_img)),
+    ("countdown", True, inv.countdown_html),
+    ("story_right", False, lambda ev: inv.story_html(ev.story_right_img)),
+    ("parents", False, inv.parents_html),
+    ("ceremony", False, inv.ceremony_html),
+    ("dress_code", False, inv.dress_code_html),
+    ("gifts", False, inv.gifts_html),
+    ("rsvp", False, inv.rsvp_title_html),
+    ("gallery", True, lambda ev: inv.thanks_html(ev) + inv.gallery_html(ev) if ev.gallery() else inv.gallery_empty_html()),
+    ("footer", False, inv.footer_html),
+)
+
+
+@dataclass
+class Download:
+    path: Path
+    nbytes: int
+    lazy: bool                  # gallery slide or song: not part of the first view
+    width: int | None = None    # intrinsic width (images)
+    needed: float | None = None # display width x dpr (images)
+
+
+@dataclass
+class Report:
+    name: str
+    html: int = 0
+    css: int = 0
+    js: int = 0
+    data: int = 0
+    files: list[Download] = field(default_factory=list)
+
+    def weight(self, lazy: bool = True) -> int:
+        return self.html + sum(d.nbytes for d in self.files if lazy or not d.lazy)
+
+
+# =========================================================
+# Measuring
+# =========================================================
+def slot_width(sizes: str, viewport: int) -> float:
+    """CSS pixel width a `sizes` attribute resolves to at `viewport` (max/min-width conditions only)."""
+    for part in sizes.split(","):
+        part = part.strip()
+        m = SIZE_PART.match(part)
+        if m:
+            limit = int(m.group(2))
+            if (viewport <= limit) if m.group(1) == "max" else (viewport >= limit):
+                part = m.group(3).strip()
+            else:
+                continue
+        if part.endswith("vw"):
+            return viewport * float(part[:-2]) / 100
+        if part.endswith("px"):
+            return float(part[:-2])
+    return float(viewport)
+
+
+def pick_candidate(srcset: str, needed: float) -> tuple[str, int]:
+    """The srcset entry a browser picks: the narrowest at least `needed` wide, else the widest."""
+    cands = sorted((int(w[:-1]), url) for url, w in (c.split() for c in srcset.split(",")))
+    w, url = next(((w, u) for w, u in cands if w >= needed), cands[-1])
+    return url, w
+
+
+def static_file(url: str) -> Path | None:
+    m = STATIC_REF.match(url)
+    return inv.STATIC_DIR / unquote(m.group(1)) if m else None
+
+
+def measure(name: str, html: str, viewport: int, dpr: float, seen: set[Path]) -> Report:
+    rep = Report(name, html=len(html.encode("utf-8")))
+    rep.css = sum(len(s.encode("utf-8")) for s in STYLE.findall(html))
+    rep.js = sum(len(s.encode("utf-8")) for s in SCRIPT.findall(html))
+    rep.data = sum(len(s) for s in DATA_URI.findall(html))
+    lazy_spans = [m.span() for m in TEMPLATE.finditer(html)]
+
+    def add(path: Path, pos: int, width: int | None = None, needed: float | None = None) -> None:
+        if path in seen or not path.is_file():
+            return
+        seen.add(path)
+        lazy = path.suffix.lower() in AUDIO_EXTS or any(a <= pos < b for a, b in lazy_spans)
+        if width is None and needed is not None:
+            entry = inv.scan_entry(path)
+            width = entry.width if entry else None
+        rep.files.append(Download(path, path.stat().st_size, lazy, width, needed))
+
+    # <picture>: the first <source> (AVIF when available) decides the download
+    covered: list[tuple[int, int]] = []
+    for m in PICTURE.finditer(html):
+        covered.append(m.span())
+        src = SOURCE.search(m.group(1))
+        if src:
+            needed = slot_width(src.group(1), viewport) * dpr
+            url, w = pick_candidate(src.group(2), needed)
+            path = static_file(url)
+            if path:
+                add(path, m.start(), w, needed)
+        else:   # fallback <img> only: the original at full width
+            ref = STATIC_REF.search(m.group(1))
+            if ref:
+                add(static_file(ref.group(0)), m.start(), needed=viewport * dpr)
+
+    # Everything else: backgrounds, fonts, the song, images without <picture>
+    for ref in STATIC_REF.finditer(html):
+        if any(a <= ref.start() < b for a, b in covered):
+            continue
+        path = static_file(ref.group(0))
+        is_image = inv.mime_for(path).startswith("image/")
+        add(path, ref.start(), needed=viewport * dpr if is_image else None)
+    return rep
+
+
+def frontend_report() -> Report:
+    """The component's own files, loaded once per page."""
+    rep = Report("frontend")
+    rep.files = [
+        Download(f, f.stat().st_size, False)
+        for f in sorted(inv.FRONTEND_DIR.iterdir())
+        if f.is_file()
+    ]
+    return rep
+
+
+def render(ev: inv.Event, viewport: int, dpr: float) -> list[Report]:
+    inv.ASSET_SERVING = "static"    # what the live app serves by default
+    inv.prebuild_images(ev)         # measure the srcsets a warmed-up server sends
+    seen: set[Path] = set()
+    fonts_css = f"<style>{inv.font_faces_css(ev)}</style>"
+    reports = [frontend_report()]
+    for name, component, build in SECTIONS:
+        html = build(ev)
+        if component and html:
+            html += fonts_css
+        reports.append(measure(name, html, viewport, dpr, seen))
+    return reports
+
+
+# =========================================================
+# Budget
+# =========================================================
+def check(reports: list[Report], budgets: dict[str, float]) -> list[str]:
+    kb = 1024
+    problems: list[str] = []
+
+    def over(label: str, value: float, key: str, unit: str = " KB") -> None:
+        if value > budgets[key]:
+            problems.append(f"{label}: {value:,.0f}{unit} > {key} {budgets[key]:,.0f}{unit}")
+
+    over("initial view", sum(r.weight(lazy=False) for r in reports) / kb, "initial_kb")
+    over("whole page", sum(r.weight() - sum(d.nbytes for d in r.files if d.path.suffix.lower() in AUDIO_EXTS)
+                           for r in reports) / kb, "total_kb")
+    over("inline <style>", sum(r.css for r in reports) / kb, "inline_css_kb")
+    over("inline <script>", sum(r.js for r in reports) / kb, "inline_js_kb")
+    for r in reports:
+        over(f"section {r.name}", r.weight() / kb, "section_kb")
+        for d in r.files:
+            if d.path.suffix.lower() in AUDIO_EXTS:
+                over(f"song {d.path.name}", d.nbytes / kb, "audio_kb")
+            elif d.needed is not None:
+                over(f"image {d.path.name}", d.nbytes / kb, "image_kb")
+                if d.width and d.width / d.needed > budgets["oversize"]:
+                    problems.append(
+                        f"image {d.path.name}: {d.width}px wide for a {d.needed:.0f}px slot "
+                        f"(x{d.width / d.needed:.1f} > oversize {budgets['oversize']:g})"
+                    )
+    return problems
+
+
+def print_report(reports: list[Report], viewport: int, dpr: float) -> None:
+    kb = 1024
+    print(f"viewport {viewport}px @ {dpr:g}x, sizes in KB (uncompressed)\n")
+    print(f"{'section':<12} {'html':>7} {'<style>':>8} {'<script>':>8} {'data:':>7} {'files':>7} {'total':>7}")
+    for r in reports:
+        files = sum(d.nbytes for d in r.files)
+        print(f"{r.name:<12} {r.html / kb:>7.1f} {r.css / kb:>8.1f} {r.js / kb:>8.1f} "
+              f"{r.data / kb:>7.1f} {files / kb:>7.1f} {r.weight() / kb:>7.1f}")
+    initial = sum(r.weight(lazy=False) for r in reports)
+    print(f"{'initial':<12} {'':>7} {'':>8} {'':>8} {'':>7} {'':>7} {initial / kb:>7.1f}")
+
+    images = [d for r in reports for d in r.files if d.needed is not None]
+    if images:
+        print(f"\n{'image':<36} {'KB':>7} {'width':>6} {'slot':>6}")
+        for d in images:
+            width = str(d.width) if d.width else "?"
+            print(f"{d.path.name:<36} {d.nbytes / kb:>7.1f} {width:>6} {d.needed:>6.0f}"
+                  + ("  (gallery)" if d.lazy else ""))
+
+
+def parse_budget(arg: str) -> tuple[str, float]:
+    key, _, value = arg.partition("=")
+    if key not in DEFAULT_BUDGETS:
+        raise argparse.ArgumentTypeError(f"unknown budget {key!r} (one of {', '.join(DEFAULT_BUDGETS)})")
+    try:
+        return key, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{arg!r}: expected KEY=NUMBER") from None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--event", default="", metavar="SLUG", help="events/<SLUG>/ instead of the default event")
+    ap.add_argument("--viewport", type=int, default=412, help="CSS pixel width of the device (default: 412)")
+    ap.add_argument("--dpr", type=float, default=2.0, help="device pixel ratio (default: 2)")
+    ap.add_argument("--budget", type=parse_budget, action="append", default=[], metavar="KEY=N",
+                    help="override a budget, e.g. --budget initial_kb=900 (repeatable)")
+    args = ap.parse_args()
+
+    ev = inv.event_registry().get(args.event)
+    if ev is None:
+        raise SystemExit(f"no event {args.event!r} in {inv.EVENTS_DIR}")
+    budgets = {**DEFAULT_BUDGETS, **dict(args.budget)}
+
+    reports = render(ev, args.viewport, args.dpr)
+    print_report(reports, args.viewport, args.dpr)
+    problems = check(reports, budgets)
+    if problems:
+        print(f"\nOver budget ({len(problems)}):", *(f"  ✗ {p}" for p in problems), sep="\n")
+        sys.exit(1)
+    print("\nWithin budget ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+"""Export the invitation as a static site.
+
+    python export_static.py [OUT_DIR] [--event SLUG] [--pwa]     (default: dist/, default event)
+
+Renders the same sections as `streamlit run invitacion.py` into one
+index.html plus hashed stylesheets/scripts and hashed, optimized assets, so any
+static file server can host it with no Python per visitor. The countdown
+and carousel run client-side as before; the RSVP becomes a plain form that
+opens WhatsApp with the prefilled message.
+
+Text files also get .gz / .br copies next to them; serve_static.py (or
+nginx with gzip_static / brotli_static) sends those to browsers that
+accept them, so nothing is compressed per request.
+
+With --pwa the site also gets a web app manifest, home screen icons (from
+the hero photo) and a service worker: the page, stylesheets, scripts,
+fonts and the smallest optimized copy of each photo are precached on the
+first visit (wider copies are kept as the page fetches them), so repeat
+visits open instantly and work offline. index.html is served from the
+cache and refreshed in the background (stale-while-revalidate); every
+export gets a new cache version and the old one is dropped.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import html
+import io
+import json
+import re
+import shutil
+from pathlib import Path
+from urllib.parse import unquote
+
+import invitacion as inv
+
+MARKER = ".invitacion-export"
+STATIC_REF = re.compile(re.escape(inv.STATIC_URL) + r"/([^\"'?\s)]+)\?v=([0-9a-f]+)")
+
+
+# =========================================================
+# Assets
+# =========================================================
+def collect_assets(text: str, out: Path, copied: dict[str, Path] | None = None) -> str:
+    """Copy every app/static/... file referenced in `text` to out/assets/ under a hashed name.
+
+    `copied`, when given, collects {"assets/<name>": source file}.
+    """
+    dest_dir = out / "assets"
+
+    def swap(m: re.Match) -> str:
+        src = inv.STATIC_DIR / unquote(m.group(1))
+        name = src.name if src.stem.endswith(f".{m.group(2)}") else f"{src.stem}.{m.group(2)}{src.suffix}"
+        dest = dest_dir / name
+        if not dest.exists():
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, dest)
+        if copied is not None:
+            copied[f"assets/{name}"] = src
+        return f"assets/{name}"
+
+    return STATIC_REF.sub(swap, text)
+
+
+def write_hashed(out: Path, stem: str, suffix: str, text: str) -> str:
+    data = text.encode("utf-8")
+    name = f"{stem}.{hashlib.sha1(data).hexdigest()[:10]}{suffix}"
+    (out / name).write_bytes(data)
+    return name
+
+
+# =========================================================
+# Static-only pieces
+# =========================================================
+# Layout that Streamlit's columns/containers provide on the live page
+EXPORT_CSS = """
+body { margin: 0; }
+.page { max-width: 1280px; margin: 0 auto; padding: 24px 32px 48px; box-sizing: border-box; }
+.story-row { display: grid; grid-template-columns: 1.2fr 1fr 1.2fr; gap: 32px; align-items: center; margin: 18px 0; }
+.rsvp-wrap { max-width: 640px; margin: 0 auto; }
+.rsvp-form {
+  display: flex; flex-direction: column; gap: 14px;
+  border: 1px solid rgba(245,240,232,0.22); border-radius: 18px;
+  padding: 18px 18px 14px 18px; box-shadow: 0 10px 26px rgba(0,0,0,0.18);
+}
+.rsvp-form label { display: flex; flex-direction: column; gap: 6px; color: rgba(245,240,232,0.92); font-style: italic; font-size: 16px; }
+.rsvp-form input, .rsvp-form select, .rsvp-form textarea {
+  font: inherit; font-style: normal; padding: 10px 12px;
+  background: rgba(255,255,255,0.10); color: rgba(245,240,232,0.95);
+  border: 1px solid rgba(245,240,232,0.20); border-radius: 12px;
+}
+.rsvp-form select option { color: #111; }
+.rsvp-form textarea { min-height: 140px; }
+.rsvp-form button {
+  width: 100%; background: rgba(215,194,154,0.78); color: #111; border: none;
+  border-radius: 12px; padding: 0.65rem 1rem; font: inherit; font-weight: 700; cursor: pointer;
+}
+.rsvp-note { color: rgba(245,240,232,0.92); text-align: center; }
+@media (max-width: 768px) {
+  .page { padding: 12px 12px 32px; }
+  .story-row { grid-template-columns: 1fr; gap: 12px; }
+}
+"""
+
+
+def rsvp_form_html(ev: inv.Event) -> str:
+    esc = html.escape
+    personas = "".join(f"<option>{i}</option>" for i in range(1, inv.PERSONAS_MAX + 1))
+    fallback = inv.wa_link(ev.whatsapp_e164, "Hola! Confirmación de asistencia a su boda:")
+    return f"""
+<div class="rsvp-wrap">
+  <form id="rsvpForm" class="rsvp-form" data-phone="{esc(ev.whatsapp_e164)}">
+    <label>¿Asistirás?
+      <select name="asistencia" required>
+        <option value="">{esc(inv.ASISTENCIA_OPTS[0])}</option>
+        <option>Sí</option>
+        <option>No</option>
+      </select>
+    </label>
+    <label>Nombre <input name="nombre" autocomplete="name" required /></label>
+    <label>¿Cuántas personas asistirán?
+      <select name="personas" disabled>
+        <option value="">{esc(inv.PERSONAS_PLACEHOLDER)}</option>
+        {personas}
+      </select>
+    </label>
+    <label>Comentarios y Felicitaciones <textarea name="comentarios"></textarea></label>
+    <button type="submit">Confirmar</button>
+    <p class="rsvp-note" id="rsvpNote" hidden>Listo ✅ Se abrió WhatsApp con tu mensaje de confirmación prellenado.</p>
+  </form>
+  <noscript><a class="btn-link" href="{esc(fallback)}">Confirmar por WhatsApp</a></noscript>
+</div>
+<script>
+(function () {{
+  const form = document.getElementById("rsvpForm");
+  const asistencia = form.elements.asistencia;
+  const personas = form.elements.personas;
+
+  asistencia.addEventListener("change", () => {{
+    personas.disabled = asistencia.value !== "Sí";
+    personas.required = !personas.disabled;
+  }});
+
+  // Same text as rsvp_message() in invitacion.py
+  form.addEventListener("submit", (e) => {{
+    e.preventDefault();
+    const nombre = form.elements.nombre.value.trim();
+    const n = asistencia.value === "Sí" ? parseInt(personas.value, 10) : 0;
+    const comentarios = form.elements.comentarios.value.trim();
+    let msg = `Hola! Soy ${{nombre}}. \\nConfirmación de asistencia a su boda: ${{asistencia.value}} . \\nPersonas: ${{n}}.`;
+    if (comentarios) msg += `\\n\\nComentarios: ${{comentarios}}`;
+    window.open(`https://wa.me/${{form.dataset.phone}}?text=${{encodeURIComponent(msg)}}`, "_blank");
+    document.getElementById("rsvpNote").hidden = false;
+  }});
+}})();
+</script>
+"""
+
+
+# =========================================================
+# Offline (--pwa)
+# Hashed files never change, so they are served cache-first; index.html
+# and the manifest are stale-while-revalidate. The song (Range requests)
+# and other origins (WhatsApp, Maps) always go to the network, except
+# the Google Fonts stylesheet/files used when there are no local fonts.
+# =========================================================
+ICON_SIZES = (192, 512)
+VARIANT_NAME = re.compile(r"(.+)-(\d+)\.[0-9a-f]{10}(\.\w+)")     # assets/<stem>-<digest>-<width>.<hash>.<fmt>
+
+SERVICE_WORKER_JS = """
+const VERSION = __VERSION__;
+const PRECACHE = __PRECACHE__;
+const IMAGES = __IMAGES__;          // {format: [files]}, preferred format first
+const PROBES = __PROBES__;          // {format: 1x1 data URI}
+const CACHE = "invitacion-" + VERSION;
+const HASHED = /\\.[0-9a-f]{10}\\.[^./]+$/;
+const FONT_HOSTS = ["fonts.googleapis.com", "fonts.gstatic.com"];
+
+// The first format this browser decodes, i.e. the <source> its <picture>s pick
+async function imageFormat() {
+  for (const fmt of Object.keys(IMAGES)) {
+    try {
+      if (PROBES[fmt]) await createImageBitmap(await (await fetch(PROBES[fmt])).blob());
+      return fmt;
+    } catch (err) {}
+  }
+  return null;
+}
+
+self.addEventListener("install", (e) => {
+  e.waitUntil((async () => {
+    const cache = await caches.open(CACHE);
+    const fmt = await imageFormat();
+    await cache.addAll(PRECACHE.concat(IMAGES[fmt] || []));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (e) => {
+  e.waitUntil(
+    caches.keys()
+      .then((keys) => Promise.all(keys.filter((k) => k.startsWith("invitacion-") && k !== CACHE).map((k) => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// photo-<digest>-<width>.<hash>.<fmt>: the same photo at any width will do offline
+const VARIANT = /^(.*-[0-9a-f]{10})-\\d+\\.[0-9a-f]{10}(\\.\\w+)$/;
+
+async function otherWidth(cache, url) {
+  const m = VARIANT.exec(new URL(url).pathname);
+  if (!m) return undefined;
+  for (const key of await cache.keys()) {
+    const k = VARIANT.exec(new URL(key.url).pathname);
+    if (k && k[1] === m[1] && k[2] === m[2]) return cache.match(key);
+  }
+  return undefined;
+}
+
+async function cacheFirst(req) {
+  const cache = await caches.open(CACHE);
+  const hit = await cache.match(req);
+  if (hit) return hit;
+  try {
+    const res = await fetch(req);
+    if (res.ok) cache.put(req, res.clone());
+    return res;
+  } catch (err) {
+    const alt = await otherWidth(cache, req.url);
+    if (alt) return alt;
+    throw err;
+  }
+}
+
+async function staleWhileRevalidate(req, key) {
+  const cache = await caches.open(CACHE);
+  const hit = await cache.match(key, { ignoreSearch: true });
+  const update = fetch(req).then((res) => {
+    if (res.ok) cache.put(key, res.clone());
+    return res;
+  });
+  if (!hit) return update;
+  update.catch(() => {});     // offline: the cached copy is all there is
+  return hit;
+}
+
+self.addEventListener("fetch", (e) => {
+  const req = e.request;
+  if (req.method !== "GET" || req.headers.has("range")) return;
+  const url = new URL(req.url);
+
+  if (url.origin !== location.origin) {
+    if (FONT_HOSTS.includes(url.hostname)) e.respondWith(staleWhileRevalidate(req, req));
+    return;
+  }
+  if (req.mode === "navigate") {
+    e.respondWith(staleWhileRevalidate(req, "./"));
+  } else if (HASHED.test(url.pathname)) {
+    e.respondWith(cacheFirst(req));
+  } else {
+    e.respondWith(staleWhileRevalidate(req, req));
+  }
+});
+"""
+
+
+def write_icons(ev: inv.Event, out: Path) -> list[dict[str, str]]:
+    """Square PNG icons cropped from the hero photo; [] without Pillow or a hero."""
+    if inv.Image is None or not ev.hero_img:
+        return []
+    icons = []
+    with inv.Image.open(ev.hero_img) as im:
+        im = inv.ImageOps.exif_transpose(im).convert("RGB")
+        for size in ICON_SIZES:
+            name = f"icon-{size}.png"
+            # same framing as the hero (object-position: center 38%)
+            inv.ImageOps.fit(im, (size, size), inv.Image.LANCZOS, centering=(0.5, 0.38)).save(out / name)
+            icons.append({"src": name, "sizes": f"{size}x{size}", "type": "image/png", "purpose": "any"})
+    return icons
+
+
+def write_manifest(ev: inv.Event, out: Path, icons: list[dict[str, str]]) -> None:
+    manifest = {
+        "name": f"{ev.couple_1} & {ev.couple_2}",
+        "short_name": "Boda",
+        "lang": "es",
+        "start_url": "./",
+        "scope": "./",
+        "display": "standalone",
+        "background_color": "#000000",
+        "theme_color": ev.theme_accent,
+        "icons": icons,
+    }
+    (out / "manifest.webmanifest").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def format_probe(fmt: str) -> str:
+    """1x1 image in `fmt` as a data URI, for the worker to test decoding."""
+    buf = io.BytesIO()
+    inv.Image.new("RGB", (1, 1)).save(buf, format=fmt.upper())
+    return f"data:image/{fmt};base64,{base64.b64encode(buf.getvalue()).decode()}"
+
+
+def narrowest_variants(names: list[str]) -> list[str]:
+    """The narrowest width of every photo in every format; wider ones are cached as the page asks for them."""
+    best: dict[tuple[str, str], tuple[int, str]] = {}
+    for name in names:
+        m = VARIANT_NAME.fullmatch(name)
+        if m:
+            key, width = (m.group(1), m.group(3)), int(m.group(2))
+            if key not in best or width < best[key][0]:
+                best[key] = (width, name)
+    return sorted(name for _, name in best.values())
+
+
+def write_service_worker(out: Path, precache: list[str], images: list[str]) -> None:
+    """sw.js precaching `precache` plus the `images` of the one format the browser will use.
+
+    Its version is the hash of all those files, so any change installs a new worker.
+    """
+    by_format: dict[str, list[str]] = {}
+    for fmt in inv.RESPONSIVE_FORMATS:
+        files = [n for n in images if n.endswith(f".{fmt}")]
+        if files:
+            by_format[fmt] = files
+    # the last format is the baseline every browser gets, no probe needed
+    probes = {fmt: format_probe(fmt) for fmt in list(by_format)[:-1]}
+
+    digest = hashlib.sha1()
+    for name in precache + images:
+        path = out / ("index.html" if name == "./" else name)
+        digest.update(name.encode("utf-8") + path.read_bytes())
+    js = (SERVICE_WORKER_JS
+          .replace("__VERSION__", json.dumps(digest.hexdigest()[:10]))
+          .replace("__PRECACHE__", json.dumps(precache))
+          .replace("__IMAGES__", json.dumps(by_format))
+          .replace("__PROBES__", json.dumps(probes)))
+    (out / "sw.js").write_text(js.lstrip(), encoding="utf-8")
+
+
+def pwa_head_html(ev: inv.Event, icons: list[dict[str, str]]) -> str:
+    touch = f'<link rel="apple-touch-icon" href="{icons[0]["src"]}" />' if icons else ""
+    return f"""<link rel="manifest" href="manifest.webmanifest" />
+<meta name="theme-color" content="{html.escape(ev.theme_accent)}" />
+{touch}"""
+
+
+PWA_REGISTER_JS = """<script>
+if ("serviceWorker" in navigator) {
+  window.addEventListener("load", () => navigator.serviceWorker.register("sw.js").catch(() => {}));
+}
+</script>"""
+
+
+# =========================================================
+# Page
+# =========================================================
+def render_page(ev: inv.Event, css_href: str, client_css: str, client_js: str, pwa_head: str = "") -> str:
+    title = html.escape(f"{ev.couple_1} & {ev.couple_2}")
+    if ev.gallery():
+        gallery = inv.thanks_html(ev) + inv.gallery_html(ev)
+    else:
+        gallery = inv.gallery_empty_html()
+
+    return f"""<!doctype html>
+<html lang="es">
+<head>
+<meta charset="utf-8" />
+<meta name="viewport" content="width=device-width, initial-scale=1" />
+<title>{title}</title>
+<link rel="icon" href="data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>💍</text></svg>" />
+{inv.font_preload_html(ev)}
+{pwa_head}
+<link rel="stylesheet" href="{client_css}" />
+<link rel="stylesheet" href="{css_href}" />
+</head>
+<body class="stApp">
+<main class="page">
+{inv.hero_html(ev) if ev.hero_img else ""}
+{inv.intro_html(ev)}
+<div class="story-row">
+  <div>{inv.story_html(ev.story_left_img)}</div>
+  <div>{inv.countdown_html(ev)}</div>
+  <div>{inv.story_html(ev.story_right_img)}</div>
+</div>
+{inv.parents_html(ev)}
+{inv.ceremony_html(ev)}
+{inv.dress_code_html(ev)}
+{inv.gifts_html(ev)}
+{inv.rsvp_title_html(ev)}
+{rsvp_form_html(ev)}
+{gallery}
+{inv.footer_html(ev)}
+</main>
+<script src="{client_js}"></script>
+<script>window.__inv.mount(document); window.__inv.reveal();</script>
+{PWA_REGISTER_JS if pwa_head else ""}
+</body>
+</html>
+"""
+
+
+def export(out: Path, slug: str = "", pwa: bool = False) -> Path:
+    ev = inv.event_registry().get(slug)
+    if ev is None:
+        raise SystemExit(f"no event {slug!r} in {inv.EVENTS_DIR}")
+
+    if out.exists():
+        if any(out.iterdir()) and not (out / MARKER).exists():
+            raise SystemExit(f"{out} is not empty and was not created by export_static.py")
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+    (out / MARKER).write_text("")
+
+    # Builders emit app/static/... URLs in this mode; they are rewritten below.
+    inv.ASSET_SERVING = "static"
+    inv.prebuild_images(ev)     # the live app encodes them in the background instead
+
+    # The same client CSS/JS the Streamlit component loads (frontend/)
+    client_css = write_hashed(out, "invitacion", ".css", (inv.FRONTEND_DIR / "invitacion.css").read_text("utf-8"))
+    client_js = write_hashed(out, "invitacion", ".js", (inv.FRONTEND_DIR / "invitacion.js").read_text("utf-8"))
+
+    css_files: dict[str, Path] = {}
+    page_files: dict[str, Path] = {}
+    css = inv.global_css(ev).split("<style>", 1)[1].rsplit("</style>", 1)[0]
+    css += inv.theme_vars_css(ev) + EXPORT_CSS
+    css_name = write_hashed(out, "app", ".css", collect_assets(css, out, css_files))
+
+    icons = write_icons(ev, out) if pwa else []
+    if pwa:
+        write_manifest(ev, out, icons)
+    pwa_head = pwa_head_html(ev, icons) if pwa else ""
+    page = collect_assets(render_page(ev, css_name, client_css, client_js, pwa_head), out, page_files)
+    index = out / "index.html"
+    index.write_text(page, encoding="utf-8")
+
+    if pwa:
+        # Shell + fonts + the narrowest copy of each photo (one format, picked
+        # by the worker); offline, a wider copy that was never fetched falls
+        # back to it. The page's originals are only the <picture> fallback and
+        # the song streams, so those are left to the network.
+        fonts = [name for name, src in page_files.items() if src.parent == inv.FONTS_OUT]
+        images = [name for name, src in page_files.items() if src.parent == inv.DERIVED]
+        precache = ["./", client_css, client_js, css_name, "manifest.webmanifest"]
+        precache += [i["src"] for i in icons] + sorted(set(css_files) | set(fonts))
+        write_service_worker(out, precache, narrowest_variants(images))
+
+    for f in sorted(out.rglob("*")):
+        if f.is_file():
+            inv.precompress(f)
+    return index
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("out", nargs="?", default="dist", type=Path, help="output directory (default: dist/)")
+    ap.add_argument("--event", default="", metavar="SLUG", help="events/<SLUG>/ instead of the default event")
+    ap.add_argument("--pwa", action="store_true", help="add a web app manifest and an offline service worker")
+    args = ap.parse_args()
+
+    index = export(args.out, args.event, args.pwa)
+    files = [f for f in args.out.rglob("*") if f.is_file() and f.suffix not in (".gz", ".br")]
+    total = sum(f.stat().st_size for f in files)
+    wire = 0    # what a browser accepting br/gzip downloads
+    for f in files:
+        packed = [c.stat().st_size for c in (f.with_name(f.name + ".br"), f.with_name(f.name + ".gz")) if c.exists()]
+        wire += min([f.stat().st_size, *packed])
+    print(f"Exported {index} ({total / 1024:.0f} KB in {args.out}, {wire / 1024:.0f} KB compressed)")
+
+
+if __name__ == "__main__":
+    main()
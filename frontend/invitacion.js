@@ -0,0 +1,369 @@
+// Client side of the invitation: hero music, calendar/countdown, gallery
+// carousel and the scroll-reveal animations.
+//
+// The markup comes from the section builders in invitacion.py. Elements
+// marked with data-inv="<section>" are wired up by mount(root). Two hosts:
+//  - the "invitacion" Streamlit component (index.html): every instance gets
+//    {html, theme, fonts, height, reveal} as args and re-renders only when they change,
+//  - the static export (export_static.py): mount(document) on load.
+(function () {
+  if (window.__inv) return;
+  const inv = window.__inv = {};
+  const inFrame = window.parent !== window;
+
+  // =========================================================
+  // Frame height: post only when it changes (ResizeObserver, no polling)
+  // =========================================================
+  let fixedHeight = null;
+  let lastHeight = -1;
+
+  function postHeight() {
+    const height = fixedHeight !== null ? fixedHeight : document.body.scrollHeight;
+    if (height === lastHeight) return;
+    lastHeight = height;
+    window.parent.postMessage({isStreamlitMessage: true, type: "streamlit:setFrameHeight", height: height}, "*");
+  }
+
+  function watchHeight() {
+    postHeight();
+    if ("ResizeObserver" in window) new ResizeObserver(postHeight).observe(document.body);
+    else window.addEventListener("resize", postHeight);
+    window.addEventListener("load", postHeight);
+  }
+
+  // =========================================================
+  // One clock for everything that ticks: aligned to second boundaries via
+  // requestAnimationFrame, stopped while the tab is hidden.
+  // =========================================================
+  const subs = [];
+  let timer = null;
+
+  function beat() {
+    timer = null;
+    const now = Date.now();
+    subs.forEach((fn) => fn(now));
+    schedule();
+  }
+
+  function schedule() {
+    if (timer !== null || document.hidden || !subs.length) return;
+    timer = setTimeout(() => requestAnimationFrame(beat), 1000 - (Date.now() % 1000) + 5);
+  }
+
+  document.addEventListener("visibilitychange", () => {
+    if (document.hidden) {
+      clearTimeout(timer);
+      timer = null;
+    } else if (timer === null) {
+      beat();
+    }
+  });
+
+  inv.everySecond = (fn) => {
+    subs.push(fn);
+    fn(Date.now());
+    schedule();
+  };
+
+  // =========================================================
+  // Sections
+  // =========================================================
+  const sections = {};
+
+  // HERO music: nothing is downloaded until the first tap (preload="none"),
+  // then the browser streams the first <source> it can play.
+  sections.hero = (root) => {
+    const btn = root.querySelector("#musicBtn");
+    const audio = root.querySelector("#bgm");
+    const note = root.querySelector("#tapNote");
+    const hasMusic = !!(audio && audio.querySelector("source"));
+
+    let playing = false;
+
+    function setIcon() {
+      btn.innerText = playing ? "🔊" : "🔈";
+    }
+
+    function showNote(show) {
+      note.style.display = show ? "inline-block" : "none";
+    }
+
+    async function play() {
+      try {
+        await audio.play();
+        playing = true;
+      } catch (e) {
+        playing = false;
+      }
+      setIcon();
+      showNote(!playing);
+    }
+
+    if (hasMusic) {
+      showNote(true);
+      // First tap anywhere on the hero starts the music (the button toggles it)
+      document.addEventListener("click", () => {
+        if (!playing) play();
+      }, { once: true });
+    }
+
+    btn.addEventListener("click", async (e) => {
+      e.stopPropagation();
+      if (!hasMusic) {
+        alert("No hay música cargada. Sube assets/song.mp3");
+        return;
+      }
+      if (!playing) {
+        await play();
+      } else {
+        audio.pause();
+        playing = false;
+        setIcon();
+        }
+    });
+
+    setIcon();
+  };
+
+  // STORY + CALENDAR + COUNTDOWN: the month grid and the first values
+  // come rendered from the server; only the numbers are updated here.
+  sections.countdown = (root) => {
+    const targetMs = new Date(root.dataset.target).getTime();   // ISO with UTC offset
+
+    const out = ["d", "h", "m", "s"].map((id) => root.querySelector("#" + id));
+    const last = out.map((el) => Number(el.textContent));
+
+    function tick(now) {
+      let diff = Math.max(0, targetMs - now);
+
+      const days = Math.floor(diff / (1000*60*60*24));
+      diff -= days * (1000*60*60*24);
+      const hrs = Math.floor(diff / (1000*60*60));
+      diff -= hrs * (1000*60*60);
+      const mins = Math.floor(diff / (1000*60));
+      diff -= mins * (1000*60);
+      const secs = Math.floor(diff / 1000);
+
+      // only touch the fields that changed (usually just the seconds)
+      [days, hrs, mins, secs].forEach((v, i) => {
+        if (last[i] !== v) {
+          last[i] = v;
+          out[i].textContent = v;
+        }
+      });
+    }
+
+    inv.everySecond(tick);
+  };
+
+  // GALLERY SLIDER: slides ship their <picture> inside a <template>, so
+  // nothing is fetched until a slide is the current one or next to it.
+  sections.gallery = (root) => {
+    const track = root.querySelector("#track");
+    const viewport = track.parentElement;
+    const slideEls = Array.from(track.querySelectorAll(".slide"));
+    const dotsDiv = root.querySelector("#dots");
+    const prevBtn = root.querySelector("#prevBtn");
+    const nextBtn = root.querySelector("#nextBtn");
+    const n = slideEls.length;
+
+    let idx = 0;
+    let pending = 0;
+
+    const wrap = (i) => (i + n) % n;
+
+    function load(i) {
+      const el = slideEls[i];
+      if (!el.ready) {
+        const tpl = el.querySelector("template");
+        el.appendChild(tpl.content.cloneNode(true));
+        tpl.remove();
+        const img = el.querySelector("img");
+        // decode() resolves once the image is ready to paint (or fails: show it anyway)
+        el.ready = img && img.decode ? img.decode().catch(() => {}) : Promise.resolve();
+      }
+      return el.ready;
+    }
+
+    function warm(i) {
+      load(i);
+      if (n > 1) {
+        load(wrap(i + 1));
+        load(wrap(i - 1));
+      }
+    }
+
+    // Dots are built once; only their class changes afterwards.
+    const dots = slideEls.map((_, i) => {
+      const d = document.createElement("div");
+      d.className = "dot";
+      d.onclick = () => go(i);
+      dotsDiv.appendChild(d);
+      return d;
+    });
+
+    function render() {
+      track.style.transform = `translateX(${-idx * 100}%)`;
+      dots.forEach((d, i) => d.classList.toggle("active", i === idx));
+    }
+
+    async function go(target) {
+      if (n === 0) return;
+      target = wrap(target);
+      const ticket = ++pending;
+      // Slides with an inline placeholder can move right away; the others
+      // wait for the decode so they don't flash in blank, but never hold
+      // navigation hostage to a slow network.
+      if (slideEls[target].style.backgroundImage) load(target);
+      else await Promise.race([load(target), new Promise((r) => setTimeout(r, 600))]);
+      if (ticket !== pending) return;   // a newer click won
+      idx = target;
+      render();
+      warm(idx);
+    }
+
+    const move = (step) => go(idx + step);
+
+    prevBtn.onclick = () => move(-1);
+    nextBtn.onclick = () => move(1);
+
+    document.addEventListener("keydown", (e) => {
+      if (e.key === "ArrowLeft") move(-1);
+      if (e.key === "ArrowRight") move(1);
+    });
+
+    // Touch swipe (horizontal only, vertical scroll stays native via touch-action)
+    let x0 = null, y0 = null;
+    viewport.addEventListener("touchstart", (e) => {
+      x0 = e.touches[0].clientX;
+      y0 = e.touches[0].clientY;
+    }, { passive: true });
+    viewport.addEventListener("touchend", (e) => {
+      if (x0 === null) return;
+      const dx = e.changedTouches[0].clientX - x0;
+      const dy = e.changedTouches[0].clientY - y0;
+      x0 = y0 = null;
+      if (Math.abs(dx) > 40 && Math.abs(dx) > Math.abs(dy)) move(dx < 0 ? 1 : -1);
+    }, { passive: true });
+
+    if (n) {
+      warm(0);
+      render();
+    }
+  };
+
+  // Fancy scroll animations (targets the Streamlit page when framed)
+  inv.reveal = () => {
+    try {
+      const doc = inFrame ? window.parent.document : document;
+
+      const obs = new IntersectionObserver((entries) => {
+        entries.forEach((e) => {
+          if (e.isIntersecting) {
+            e.target.classList.add("reveal-in");
+            obs.unobserve(e.target);
+          }
+        });
+      }, {
+        threshold: 0.14,
+        rootMargin: "0px 0px -12% 0px"
+      });
+
+      function staggerChildren(el) {
+        const kids = Array.from(el.querySelectorAll(":scope > *"));
+        kids.forEach((k, i) => {
+          k.classList.add("reveal-child");
+          k.style.setProperty("--d", `${Math.min(i, 8) * 90}ms`);
+        });
+      }
+
+      function setup() {
+        const sections = Array.from(doc.querySelectorAll(".section"));
+        const cards = Array.from(doc.querySelectorAll(".card"));
+
+        sections.forEach((el, i) => {
+          if (!el.classList.contains("reveal-target")) {
+            el.classList.add("reveal-target");
+            el.classList.add(i % 2 === 0 ? "reveal-left" : "reveal-right");
+            staggerChildren(el);
+            obs.observe(el);
+          }
+        });
+
+        cards.forEach((el) => {
+          if (!el.classList.contains("reveal-target")) {
+            el.classList.add("reveal-target", "reveal-pop");
+            staggerChildren(el);
+            obs.observe(el);
+          }
+        });
+      }
+
+      setup();
+      setTimeout(setup, 450);
+      setTimeout(setup, 1200);
+
+      const mo = new MutationObserver(() => setup());
+      mo.observe(doc.body, { childList: true, subtree: true });
+
+    } catch (err) {
+      console.warn("Fancy scroll reveal init failed:", err);
+    }
+  };
+
+  inv.mount = (root) => {
+    root.querySelectorAll("[data-inv]").forEach((el) => {
+      const init = sections[el.dataset.inv];
+      if (init && !el.__mounted) {
+        el.__mounted = true;
+        init(el);
+      }
+    });
+  };
+
+  // =========================================================
+  // Streamlit component protocol
+  // =========================================================
+  if (!inFrame || !document.getElementById("inv-root")) return;
+
+  const host = document.getElementById("inv-root");
+  const fonts = document.head.appendChild(document.createElement("style"));
+  let lastArgs = null;
+  let revealed = false;
+  const LIVE = /(\bdata-live\b[^>]*>)[^<]*/g;
+
+  // Relative URLs (app/static/...) must resolve against the Streamlit page,
+  // not against the component's own /component/... URL.
+  const page = new URLSearchParams(location.search).get("streamlitUrl");
+  if (page) {
+    const base = document.createElement("base");
+    base.href = page;
+    document.head.appendChild(base);
+  }
+
+  window.addEventListener("message", (e) => {
+    if (!e.data || e.data.type !== "streamlit:render") return;
+    const args = e.data.args || {};
+    // Live values (data-live, e.g. the countdown numbers) are kept up to
+    // date here, so new ones from the server don't count as a change.
+    const key = JSON.stringify({...args, html: (args.html || "").replace(LIVE, "$1")});
+    if (key === lastArgs) return;    // rerun with identical props: keep the DOM as is
+    lastArgs = key;
+
+    Object.entries(args.theme || {}).forEach(([k, v]) => document.documentElement.style.setProperty(`--inv-${k}`, v));
+    if (args.fonts && fonts.textContent !== args.fonts) fonts.textContent = args.fonts;
+    fixedHeight = args.height || null;
+    subs.length = 0;                 // drop clocks of the DOM being replaced
+    host.innerHTML = args.html || "";
+    inv.mount(host);
+    if (args.reveal && !revealed) {
+      revealed = true;
+      inv.reveal();
+    }
+    lastHeight = -1;
+    postHeight();
+  });
+
+  watchHeight();
+  window.parent.postMessage({isStreamlitMessage: true, type: "streamlit:componentReady", apiVersion: 1}, "*");
+})();
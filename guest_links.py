@@ -0,0 +1,111 @@
+"""Issue personal invitation links from a guest list.
+
+    python guest_links.py GUESTS_CSV --url https://boda.example.com/ [--event SLUG] [--out links.csv]
+
+GUESTS_CSV needs the columns `nombre` and `lugares` (seats). Rows without
+a `token` get a new random one and the file is rewritten in place; tokens
+that already exist are kept, so links that were sent stay valid. Prints
+one link per guest, or writes nombre/lugares/link to --out.
+
+The app reads the file from events/<slug>/guests.csv, or data/guests.csv
+for the default event.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import secrets
+import sys
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TOKEN_BYTES = 6     # 8 url-safe characters, ~2.8e14 possibilities
+
+
+def new_token(taken: set[str]) -> str:
+    while True:
+        token = secrets.token_urlsafe(TOKEN_BYTES)
+        if token not in taken:
+            taken.add(token)
+            return token
+
+
+def guest_url(base: str, event: str, token: str) -> str:
+    parts = urlsplit(base)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in ("e", "g")]
+    if event:
+        query.append(("e", event))
+    query.append(("g", token))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def issue_tokens(path: Path) -> tuple[list[dict[str, str]], int]:
+    """Read `path`, give every row a unique token, rewrite it if needed; returns (rows, issued)."""
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        reader = csv.DictReader(fh)
+        fields = [f.strip().lower() for f in reader.fieldnames or []]
+        rows, overlong = [], []
+        for r in reader:
+            if None in r:   # more fields than the header; rewriting would drop them
+                overlong.append(reader.line_num)
+                continue
+            rows.append({k.strip().lower(): (v or "").strip() for k, v in r.items()})
+
+    missing = {"nombre", "lugares"} - set(fields)
+    if missing:
+        raise SystemExit(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+    if overlong:
+        lines = ", ".join(map(str, overlong))
+        raise SystemExit(f"{path}: more fields than columns on line(s) {lines} (quote names that contain commas)")
+    if "token" not in fields:
+        fields.append("token")
+
+    taken: set[str] = set()
+    for row in rows:
+        token = row.get("token", "")
+        if token in taken:
+            row["token"] = ""   # duplicated by hand: the second row gets a new one
+        elif token:
+            taken.add(token)
+
+    issued = 0
+    for row in rows:
+        if not row.get("token"):
+            row["token"] = new_token(taken)
+            issued += 1
+
+    if issued:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with tmp.open("w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp, path)     # the app picks the new mtime up on the next lookup
+    return rows, issued
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("guests", type=Path, help="guest list CSV (nombre, lugares[, token])")
+    ap.add_argument("--url", required=True, help="public URL of the app")
+    ap.add_argument("--event", default="", metavar="SLUG", help="event slug (omit for the default event)")
+    ap.add_argument("--out", type=Path, help="write nombre, lugares, link to this CSV instead of printing")
+    args = ap.parse_args()
+
+    rows, issued = issue_tokens(args.guests)
+    links = [(r["nombre"], r["lugares"], guest_url(args.url, args.event, r["token"])) for r in rows]
+
+    if args.out:
+        with args.out.open("w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["nombre", "lugares", "link"])
+            writer.writerows(links)
+    else:
+        for name, seats, link in links:
+            print(f"{name}\t{seats}\t{link}")
+    print(f"{len(rows)} guest(s), {issued} new token(s) written to {args.guests}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,93 @@
 from __future__ import annotations
 
+import atexit
 import base64
+import calendar
+import csv
+import functools
+import gzip
+import hashlib
+import hmac
+import html as html_lib
+import importlib.util
+import io
+import os
+import queue
+import re
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
 import textwrap  # ✅ ADDED (fix HTML being shown as code block)
-from dataclasses import dataclass
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from typing import Callable
 from urllib.parse import quote
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+try:  # optional: responsive image derivatives
+    from PIL import Image, ImageFilter, ImageOps
+except ImportError:  # pragma: no cover - served as original files instead
+    Image = ImageFilter = ImageOps = None
+
+try:  # optional: .br copies of text assets, WOFF2 fonts
+    import brotli
+except ImportError:  # pragma: no cover - .gz only, Google Fonts
+    brotli = None
+
+try:  # optional: self-hosted font subsets (WOFF2 needs brotli as well)
+    from fontTools import subset as ft_subset
+except ImportError:  # pragma: no cover - falls back to the Google Fonts stylesheet
+    ft_subset = None
+if brotli is None:
+    ft_subset = None
+
+try:  # optional: inotify/FSEvents for the asset manifest (polls without it)
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover
+    Observer = None
+
+
+# =========================================================
+# One copy of the app per process
+# Streamlit executes this file as __main__ on every run, which would build
+# every class, function and constant below again, and each session keeps
+# its last copy alive (the RSVP fragment holds on to its globals). So the
+# run only loads the file once as the module `invitacion` (again when the
+# file changes) and calls that copy's main(); the strings it caches and
+# emits are the same objects for every session.
+# =========================================================
+def _app_module():
+    path = os.path.realpath(__file__)
+    mtime = os.stat(path).st_mtime_ns
+    mod = sys.modules.get("invitacion")
+    if mod is None or getattr(mod, "_source", None) != (path, mtime):
+        spec = importlib.util.spec_from_file_location("invitacion", path)
+        mod = importlib.util.module_from_spec(spec)
+        mod._source = (path, mtime)
+        sys.modules["invitacion"] = mod     # dataclasses look their module up here
+        spec.loader.exec_module(mod)
+    return mod
+
+
+if __name__ == "__main__" and get_script_run_ctx() is not None:
+    _app_module().main()
+    st.stop()
 
 
 # =========================================================
@@ -26,6 +105,7 @@ class EventInfo:
 COUPLE_1 = "Jesús Alberto"
 COUPLE_2 = "Brianna Ayelen"
 EVENT_DATE_TIME = "2026-03-22 12:00:00"   # YYYY-MM-DD HH:MM:SS (for countdown)
+EVENT_TZ = "America/Mexico_City"          # time zone of EVENT_DATE_TIME
 
 HERO_SUBTITLE = "NO FALTES A NUESTRA BODA"
 HERO_DATE_TEXT = "22 MARZO, 2026"
@@ -86,36 +166,225 @@ ASSETS = Path(__file__).parent / "assets"
 IMG_EXTS = ("jpg", "jpeg", "png", "webp")
 
 
-def pick_asset(stem: str) -> Path | None:
+def pick_asset(assets: Path, stem: str) -> Path | None:
+    entries = shared(asset_manifest).folder(assets)
     for ext in IMG_EXTS:
-        p = ASSETS / f"{stem}.{ext}"
-        if p.exists():
-            return p
+        if f"{stem}.{ext}" in entries:
+            return assets / f"{stem}.{ext}"
     return None
 
 
-HERO_IMG = pick_asset("hero")
-BG_IMG = pick_asset("bg")               # optional
-STORY_LEFT_IMG = pick_asset("story_left")
-STORY_RIGHT_IMG = pick_asset("story_right")
+# Per event: hero.* | bg.* (optional) | story_left.* | story_right.*
+# | song.mp3 (optional, streamed on first tap) | gallery*.*
+GALLERY_MAX: int | None = None        # slides load lazily, so no need to cap the gallery
+GALLERY_SIZES = "(max-width: 900px) 100vw, 860px"
+STORY_SIZES = "(max-width: 768px) 100vw, 34vw"
 
-MUSIC_FILE = ASSETS / "song.mp3"        # optional (mp3)
 
+def gallery_files(assets: Path, max_items: int | None = None) -> list[Path]:
+    out = shared(asset_manifest).gallery(assets)
+    return out if max_items is None else out[:max_items]
 
-def gallery_files(max_items: int = 8) -> list[Path]:
-    files: list[Path] = []
-    for ext in IMG_EXTS:
-        files += sorted(ASSETS.glob(f"gallery*.{ext}"))
-    # de-dup + stable order
-    seen: set[Path] = set()
-    out: list[Path] = []
-    for f in files:
-        r = f.resolve()
-        if r in seen:
-            continue
-        seen.add(r)
-        out.append(f)
-    return out[:max_items]
+
+# =========================================================
+# Events
+# One process hosts any number of invitations. The CONFIG block above is
+# the default event (no query param); every other one is a folder
+#     events/<slug>/event.toml   (+ events/<slug>/assets/)
+# opened with ?e=<slug>. Keys are the lowercase names of the constants
+# above (see events/_example/event.toml). Events are loaded on first
+# visit and the least recently visited are dropped, together with their
+# cached assets, once more than EVENTS_MAX_LOADED are in memory.
+# =========================================================
+EVENTS_DIR = Path(__file__).parent / "events"
+EVENTS_MAX_LOADED = 256
+EVENT_SLUG = re.compile(r"[a-z0-9][a-z0-9-]{0,63}")
+
+
+@dataclass(frozen=True)
+class Event:
+    slug: str
+    couple_1: str
+    couple_2: str
+    event_date_time: str
+    hero_date_text: str
+    whatsapp_e164: str
+    ceremonia: EventInfo
+    parents_novio: tuple[str, str]
+    parents_novia: tuple[str, str]
+    padrinos: tuple[str, str]
+    assets: Path
+    guest_list: Path            # guests.csv for personal links (see "Guest list")
+    hero_subtitle: str = HERO_SUBTITLE
+    intro_title: str = INTRO_TITLE
+    intro_text: str = INTRO_TEXT
+    dress_code: str = DRESS_CODE
+    dress_note: str = DRESS_NOTE
+    rsvp_title: str = RSVP_TITLE
+    thanks_text: str = THANKS_TEXT
+    footer_line_1: str = FOOTER_LINE_1
+    footer_line_2: str = ""     # defaults to "<couple_1> & <couple_2>"
+    theme_text: str = THEME_TEXT
+    theme_accent: str = THEME_ACCENT
+    card_bg: str = CARD_BG
+    card_text: str = CARD_TEXT
+    theme_overlay: str = THEME_OVERLAY
+    event_tz: str = EVENT_TZ
+    admin_password: str = field(default="", repr=False)    # ?admin for this event only (kept out of digest)
+
+    def __post_init__(self) -> None:
+        if not self.footer_line_2:
+            object.__setattr__(self, "footer_line_2", f"{self.couple_1} & {self.couple_2}")
+
+    @functools.cached_property
+    def digest(self) -> str:
+        """Hash of the whole config (keys the compiled fragments)."""
+        return hashlib.sha1(repr(self).encode("utf-8")).hexdigest()
+
+    @property
+    def starts_at(self) -> datetime:
+        """EVENT_DATE_TIME as an aware datetime (server's zone if event_tz is unknown here)."""
+        naive = datetime.strptime(self.event_date_time, "%Y-%m-%d %H:%M:%S")
+        try:
+            return naive.replace(tzinfo=ZoneInfo(self.event_tz))
+        except (ZoneInfoNotFoundError, ValueError):    # e.g. no tzdata on Windows
+            return naive.astimezone()
+
+    @property
+    def hero_img(self) -> Path | None:
+        return pick_asset(self.assets, "hero")
+
+    @property
+    def bg_img(self) -> Path | None:
+        return pick_asset(self.assets, "bg")
+
+    @property
+    def story_left_img(self) -> Path | None:
+        return pick_asset(self.assets, "story_left")
+
+    @property
+    def story_right_img(self) -> Path | None:
+        return pick_asset(self.assets, "story_right")
+
+    @property
+    def music_file(self) -> Path:
+        return self.assets / "song.mp3"
+
+    def gallery(self) -> list[Path]:
+        return gallery_files(self.assets, GALLERY_MAX)
+
+
+DEFAULT_EVENT = Event(
+    slug="",
+    couple_1=COUPLE_1,
+    couple_2=COUPLE_2,
+    event_date_time=EVENT_DATE_TIME,
+    hero_date_text=HERO_DATE_TEXT,
+    whatsapp_e164=WHATSAPP_E164,
+    ceremonia=RECEPCION,
+    parents_novio=tuple(PARENTS_NOVIO),
+    parents_novia=tuple(PARENTS_NOVIA),
+    padrinos=tuple(PADRINOS),
+    assets=ASSETS,
+    guest_list=Path(__file__).parent / "data" / "guests.csv",     # data/ is not in git
+    footer_line_2=FOOTER_LINE_2,
+)
+
+_EVENT_REQUIRED = {
+    "couple_1", "couple_2", "event_date_time", "hero_date_text", "whatsapp_e164",
+    "ceremonia", "parents_novio", "parents_novia", "padrinos",
+}
+_EVENT_KEYS = {f for f in Event.__dataclass_fields__ if f not in ("slug", "assets", "guest_list")}
+
+
+def load_event(path: Path, slug: str) -> Event:
+    """Parse events/<slug>/event.toml; raises ValueError with a readable reason."""
+    try:
+        with path.open("rb") as fh:
+            data = tomllib.load(fh)
+    except tomllib.TOMLDecodeError as err:
+        raise ValueError(f"{path.name}: {err}") from None
+
+    assets = path.parent / data.pop("assets", "assets")
+    guest_list = path.parent / data.pop("guest_list", "guests.csv")
+    unknown = sorted(set(data) - _EVENT_KEYS)
+    missing = sorted(_EVENT_REQUIRED - set(data))
+    if unknown:
+        raise ValueError(f"{path.name}: claves desconocidas {', '.join(unknown)}")
+    if missing:
+        raise ValueError(f"{path.name}: faltan {', '.join(missing)}")
+    try:
+        datetime.strptime(data["event_date_time"], "%Y-%m-%d %H:%M:%S")
+        if "event_tz" in data:
+            ZoneInfo(data["event_tz"])
+        data["ceremonia"] = EventInfo(**data["ceremonia"])
+        for key in ("parents_novio", "parents_novia", "padrinos"):
+            pair = tuple(str(x) for x in data[key])
+            if len(pair) != 2:
+                raise ValueError(f"{key} debe tener dos nombres")
+            data[key] = pair
+    except ZoneInfoNotFoundError:
+        raise ValueError(f"{path.name}: zona horaria desconocida {data['event_tz']!r}") from None
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"{path.name}: {err}") from None
+    return Event(slug=slug, assets=assets, guest_list=guest_list, **data)
+
+
+class EventRegistry:
+    """Thread-safe LRU of loaded events, bounded by count.
+
+    An entry is reloaded when its event.toml changes (mtime), so edits show
+    up on the next visit without restarting the server.
+    """
+
+    def __init__(self, root: Path, max_loaded: int) -> None:
+        self.root = root
+        self.max_loaded = max_loaded
+        self.evictions = 0
+        self._items: OrderedDict[str, tuple[int, Event]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, slug: str) -> Event | None:
+        """The event for `slug` ("" is the default one), or None if there is no such event."""
+        if not slug:
+            return DEFAULT_EVENT
+        if not EVENT_SLUG.fullmatch(slug):
+            return None
+        path = self.root / slug / "event.toml"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        with self._lock:
+            hit = self._items.get(slug)
+            if hit and hit[0] == mtime:
+                self._items.move_to_end(slug)
+                return hit[1]
+
+        ev = load_event(path, slug)     # outside the lock: parsing is the slow part
+
+        evicted = []
+        with self._lock:
+            self._items[slug] = (mtime, ev)
+            self._items.move_to_end(slug)
+            while len(self._items) > self.max_loaded:
+                evicted.append(self._items.popitem(last=False)[1][1])
+        for old in evicted:
+            self.evictions += 1
+            asset_cache().invalidate(old.assets)
+            asset_manifest().drop(old.assets)
+            guest_index().drop(old.guest_list)
+        return ev
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"loaded": len(self._items), "evictions": self.evictions}
+
+
+@st.cache_resource(show_spinner=False)
+def event_registry() -> EventRegistry:
+    return EventRegistry(EVENTS_DIR, EVENTS_MAX_LOADED)
 
 
 # =========================================================
@@ -127,66 +396,1415 @@ def mime_for(path: Path) -> str:
         suf = "jpeg"
     if suf in ("jpeg", "png", "webp"):
         return f"image/{suf}"
+    if suf == "woff2":
+        return "font/woff2"
     return "application/octet-stream"
 
 
+# =========================================================
+# Encoded asset cache (shared by ALL sessions + reruns)
+# Every rerun re-executes this file, so the base64 work is kept in a
+# process-wide LRU instead of being redone on each keystroke.
+# =========================================================
+ASSET_CACHE_MAX_BYTES = 64 * 1024 * 1024   # budget for encoded payloads
+
+
+class AssetCache:
+    """Thread-safe LRU of encoded asset strings, bounded by total size.
+
+    File entries are keyed by (kind, path, mtime, size): replacing a file in
+    assets/ gives it a new key and the stale entry simply ages out.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[tuple, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, build: Callable[[], str]) -> str:
+        with self._lock:
+            val = self._items.get(key)
+            if val is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return val
+            self.misses += 1
+
+        # Encode outside the lock so one big file doesn't stall other sessions.
+        val = build()
+
+        with self._lock:
+            if key in self._items:
+                # Another session won the race: hand out the copy already stored.
+                self._items.move_to_end(key)
+                return self._items[key]
+            if len(val) <= self.max_bytes:
+                self._items[key] = val
+                self._bytes += len(val)
+                while self._bytes > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self._bytes -= len(old)
+        return val
+
+    def invalidate(self, path: Path | None = None) -> None:
+        """Drop every entry for `path` (a file, or everything under a directory), or the whole cache."""
+        with self._lock:
+            if path is None:
+                self._items.clear()
+                self._bytes = 0
+                return
+            target = str(path)
+            prefix = target + os.sep
+            for key in [
+                k for k in self._items
+                if len(k) > 1 and isinstance(k[1], str) and (k[1] == target or k[1].startswith(prefix))
+            ]:
+                self._bytes -= len(self._items.pop(key))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def asset_cache() -> AssetCache:
+    return AssetCache(ASSET_CACHE_MAX_BYTES)
+
+
+def file_key(kind: str, path: Path) -> tuple:
+    entry = shared(asset_manifest).lookup(path)
+    if entry:
+        return (kind, str(path), entry.mtime_ns, entry.size)
+    stat = path.stat()
+    return (kind, str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("utf-8")
+
+
 def data_uri(path: Path) -> str:
-    b = base64.b64encode(path.read_bytes()).decode("utf-8")
-    return f"data:{mime_for(path)};base64,{b}"
+    return asset_cache().get(
+        file_key("data", path),
+        lambda: f"data:{mime_for(path)};base64,{_b64(path.read_bytes())}",
+    )
 
 
 def audio_uri_mp3(path: Path) -> str:
-    b = base64.b64encode(path.read_bytes()).decode("utf-8")
-    return f"data:audio/mpeg;base64,{b}"
+    return asset_cache().get(
+        file_key("audio", path),
+        lambda: f"data:audio/mpeg;base64,{_b64(path.read_bytes())}",
+    )
+
+
+def svg_uri(svg: str) -> str:
+    return asset_cache().get(
+        ("svg", svg),
+        lambda: "data:image/svg+xml;base64," + _b64(svg.encode("utf-8")),
+    )
+
+
+# =========================================================
+# Asset serving
+# "static": assets are published into ./static and referenced by URL
+#           (Streamlit static file serving, see .streamlit/config.toml).
+#           The server answers with ETag / Last-Modified and honours Range
+#           requests; the ?v=<hash> in each URL lets browsers cache the
+#           file long-term.
+# "inline": base64 data URIs (for deploys without static serving).
+# Text files (SVG, CSS, JS, HTML, ...) get .gz / .br copies when they are
+# published or exported, for a server that picks them by Accept-Encoding
+# (serve_static.py, nginx gzip_static / brotli_static) instead of
+# compressing every response.
+# =========================================================
+ASSET_SERVING = "static"        # "static" | "inline"
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL = "app/static"       # relative to the page (the component iframe sets <base> to it)
+PUBLISHED = STATIC_DIR / "assets"
+
+
+def content_hash(path: Path, n: int = 10) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()[:n]
+
+
+# =========================================================
+# Asset manifest
+# Every asset folder is listed once (first run for assets/ and
+# assets/fonts/, first visit for an event's folder): path, size, content
+# hash, MIME type and pixel size per file. A watchdog observer (or, without
+# watchdog, a polling thread) re-reads only the files that change and bumps
+# the folder's version, which is part of the compiled-fragment key; so a
+# run never lists or stats the folders, and a new gallery6.jpeg still shows
+# up without a restart.
+# =========================================================
+ASSET_POLL_INTERVAL = 2.0     # seconds, only for folders watchdog can't watch
+
+
+@dataclass(frozen=True)
+class AssetEntry:
+    path: Path
+    size: int
+    mtime_ns: int
+    inode: tuple[int, int]
+    sha1: str                   # first 10 hex digits, as content_hash()
+    mime: str
+    width: int | None = None
+    height: int | None = None
+
+
+def scan_entry(path: Path) -> AssetEntry | None:
+    try:
+        st_ = path.stat()
+        if not path.is_file():
+            return None
+        digest = content_hash(path)
+    except OSError:
+        return None
+    mime = mime_for(path)
+    width = height = None
+    if Image is not None and mime.startswith("image/"):
+        try:
+            with Image.open(path) as im:    # reads the header only
+                width, height = im.size
+        except Exception:
+            pass
+    return AssetEntry(path, st_.st_size, st_.st_mtime_ns, (st_.st_dev, st_.st_ino), digest, mime, width, height)
+
+
+def scan_folder(folder: Path) -> dict[str, AssetEntry]:
+    try:
+        names = sorted(e.name for e in os.scandir(folder) if not e.name.startswith("."))
+    except OSError:
+        return {}
+    entries = {name: scan_entry(folder / name) for name in names}
+    return {name: e for name, e in entries.items() if e}
+
+
+class _ManifestHandler:
+    """watchdog event handler: refresh the file(s) an event names."""
+
+    def __init__(self, manifest: AssetManifest) -> None:
+        self.manifest = manifest
+
+    def dispatch(self, event) -> None:
+        if event.is_directory:
+            return
+        for p in (event.src_path, getattr(event, "dest_path", "")):
+            if p:
+                self.manifest.refresh(Path(os.fsdecode(p)))
+
+
+class AssetManifest:
+    """Process-wide {folder: {name: AssetEntry}}, kept current by a watcher."""
+
+    def __init__(self, poll_interval: float = ASSET_POLL_INTERVAL) -> None:
+        self.poll_interval = poll_interval
+        self.refreshes = 0
+        self._folders: dict[Path, dict[str, AssetEntry]] = {}   # replaced, never mutated
+        self._galleries: dict[Path, list[Path]] = {}
+        self._versions: dict[Path, int] = {}
+        self._watches: dict[Path, object] = {}
+        self._polled: set[Path] = set()
+        self._lock = threading.Lock()
+        self._observer = None
+        self._poller: threading.Thread | None = None
+        if Observer is not None:
+            try:
+                self._observer = Observer()
+                self._observer.daemon = True
+                self._observer.start()
+            except Exception as err:     # e.g. inotify limit reached
+                print(f"[assets] file watcher unavailable, polling instead: {err}")
+                self._observer = None
+
+    # ---- lookups (what a run uses) ----
+    def folder(self, folder: Path) -> dict[str, AssetEntry]:
+        entries = self._folders.get(folder)
+        if entries is None:
+            entries = self._add(folder)
+        return entries
+
+    def get(self, path: Path) -> AssetEntry | None:
+        return self.folder(path.parent).get(path.name)
+
+    def lookup(self, path: Path) -> AssetEntry | None:
+        """Like get(), but only for folders already in the manifest (never starts watching one)."""
+        entries = self._folders.get(path.parent)
+        return entries.get(path.name) if entries else None
+
+    def version(self, folder: Path) -> int:
+        self.folder(folder)
+        return self._versions[folder]
+
+    def gallery(self, folder: Path) -> list[Path]:
+        self.folder(folder)
+        return self._galleries[folder]
+
+    # ---- maintenance ----
+    def _add(self, folder: Path) -> dict[str, AssetEntry]:
+        entries = scan_folder(folder)   # outside the lock: hashing is the slow part
+        with self._lock:
+            if folder in self._folders:
+                return self._folders[folder]
+            self._set(folder, entries)
+            self._versions[folder] = 0
+            self._watch(folder)
+        return entries
+
+    def _set(self, folder: Path, entries: dict[str, AssetEntry]) -> None:
+        self._folders[folder] = entries
+        # gallery*.<ext>, grouped by extension in IMG_EXTS order; hard links / copies of the same inode once
+        files = sorted(
+            (IMG_EXTS.index(e.path.suffix[1:]), name, e)
+            for name, e in entries.items()
+            if name.startswith("gallery") and e.path.suffix[1:] in IMG_EXTS
+        )
+        seen: set[tuple[int, int]] = set()
+        gallery = []
+        for _, _, e in files:
+            if e.inode not in seen:
+                seen.add(e.inode)
+                gallery.append(e.path)
+        self._galleries[folder] = gallery
+
+    def _watch(self, folder: Path) -> None:
+        if self._observer is not None and folder.is_dir():
+            try:
+                self._watches[folder] = self._observer.schedule(_ManifestHandler(self), str(folder), recursive=False)
+                return
+            except Exception as err:
+                print(f"[assets] cannot watch {folder}, polling it: {err}")
+        self._polled.add(folder)    # also covers folders that don't exist yet
+        if self._poller is None:
+            self._poller = threading.Thread(target=self._poll, name="asset-poller", daemon=True)
+            self._poller.start()
+
+    def refresh(self, path: Path) -> None:
+        """Re-read one file after a change notification (no-op if nothing changed)."""
+        folder = path.parent
+        if folder not in self._folders or path.name.startswith("."):
+            return
+        old = self._folders[folder].get(path.name)
+        try:
+            st_ = path.stat()
+            if old and (old.mtime_ns, old.size) == (st_.st_mtime_ns, st_.st_size):
+                return
+        except OSError:
+            if old is None:
+                return
+        entry = scan_entry(path)
+        with self._lock:
+            entries = self._folders.get(folder)
+            if entries is None:
+                return
+            entries = dict(entries)
+            if entry:
+                entries[path.name] = entry
+            else:
+                entries.pop(path.name, None)
+            self._set(folder, dict(sorted(entries.items())))
+            self._versions[folder] += 1
+            self.refreshes += 1
+
+    def _poll(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                folders = list(self._polled)
+            for folder in folders:
+                try:
+                    with os.scandir(folder) as it:
+                        current = {e.name: e.stat() for e in it if e.is_file() and not e.name.startswith(".")}
+                except OSError:
+                    current = {}
+                known = self._folders.get(folder, {})
+                for name in current.keys() | known.keys():
+                    e, cur = known.get(name), current.get(name)
+                    if e is None or cur is None or (e.mtime_ns, e.size) != (cur.st_mtime_ns, cur.st_size):
+                        self.refresh(folder / name)
+
+    def drop(self, folder: Path) -> None:
+        with self._lock:
+            self._folders.pop(folder, None)
+            self._galleries.pop(folder, None)
+            self._versions.pop(folder, None)
+            self._polled.discard(folder)
+            watch = self._watches.pop(folder, None)
+        if watch is not None:
+            try:
+                self._observer.unschedule(watch)
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "folders": len(self._folders),
+                "entries": sum(len(e) for e in self._folders.values()),
+                "watched": len(self._watches),
+                "polled": len(self._polled),
+                "refreshes": self.refreshes,
+            }
+
+
+@st.cache_resource(show_spinner=False, on_release=AssetManifest.close)
+def asset_manifest() -> AssetManifest:
+    manifest = AssetManifest()
+    for folder in (ASSETS, FONTS_SRC):     # listed at startup, events on first visit
+        manifest.folder(folder)
+    return manifest
+
+
+def asset_hash(path: Path) -> str:
+    entry = shared(asset_manifest).lookup(path)
+    return entry.sha1 if entry else content_hash(path)
+
+
+PRECOMPRESS_SUFFIXES = (".html", ".css", ".js", ".mjs", ".svg", ".json", ".webmanifest", ".txt", ".xml")
+PRECOMPRESS_MIN_BYTES = 256
+
+
+def precompress(path: Path, force: bool = False) -> list[Path]:
+    """Write `path`.gz (and `path`.br with brotli) for a text file; returns the copies that exist.
+
+    A copy is kept only if it is smaller than the original, and rebuilt only
+    when the original is newer (or `force`).
+    """
+    if path.suffix.lower() not in PRECOMPRESS_SUFFIXES:
+        return []
+    src = path.stat()
+    if src.st_size < PRECOMPRESS_MIN_BYTES:
+        return []
+
+    encoders = {".gz": lambda b: gzip.compress(b, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoders[".br"] = lambda b: brotli.compress(b, quality=11)
+
+    data = None
+    out = []
+    for suffix, encode in encoders.items():
+        dest = path.with_name(path.name + suffix)
+        try:
+            if not force and dest.stat().st_mtime_ns >= src.st_mtime_ns:
+                out.append(dest)
+                continue
+        except OSError:
+            pass
+        if data is None:
+            data = path.read_bytes()
+        packed = encode(data)
+        if len(packed) >= len(data):
+            dest.unlink(missing_ok=True)
+            continue
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(packed)
+        os.replace(tmp, dest)
+        out.append(dest)
+    return out
+
+
+def publish_asset(path: Path) -> Path:
+    """Copy `path` under STATIC_DIR (if it isn't there already) and return the served file.
+
+    The copy is named after its content (assets/<stem>.<hash><ext>), so two events
+    with a bg.jpeg of their own never overwrite each other's file.
+    """
+    try:
+        path.relative_to(STATIC_DIR)
+        return path
+    except ValueError:
+        pass
+
+    dest = PUBLISHED / f"{path.stem}.{asset_hash(path)}{path.suffix}"
+    if dest.exists():
+        return dest
+
+    PUBLISHED.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.copy2(path, tmp)     # keeps mtime -> stable Last-Modified
+    os.replace(tmp, dest)
+    precompress(dest, force=True)    # copy2 kept the old mtime, so don't trust it
+    return dest
+
+
+def asset_url(path: Path) -> str:
+    def build() -> str:
+        served = publish_asset(path)
+        rel = served.relative_to(STATIC_DIR).as_posix()
+        return f"{STATIC_URL}/{quote(rel)}?v={asset_hash(path)}"
+
+    return asset_cache().get(file_key("url", path), build)
+
+
+def image_src(path: Path | None) -> str:
+    if not path:
+        return ""
+    return asset_url(path) if ASSET_SERVING == "static" else data_uri(path)
+
+
+
+
+# =========================================================
+# Responsive images
+# On first use each photo is re-encoded at a few widths (WebP + AVIF when
+# Pillow supports it), EXIF-rotated then stripped, and cached on disk in
+# static/derived/. Templates get a <picture> with srcset/sizes. Encoding
+# runs as a background job (once per file version, however many visitors
+# arrive); until it finishes the original is served. prebuild_images()
+# (prebuild_assets.py, export_static.py) does it ahead of time instead.
+# The hero and the gallery slides also get a ~20 px blurred WebP inlined
+# as their background, so something shows before the first byte arrives.
+# Without Pillow (or in "inline" mode) the original file is used.
+# =========================================================
+RESPONSIVE_WIDTHS = (480, 960, 1600)
+RESPONSIVE_FORMATS = ("avif", "webp")    # preferred first
+RESPONSIVE_QUALITY = {"avif": 50, "webp": 72}
+LQIP_WIDTH = 20
+LQIP_QUALITY = 40
+DERIVED = STATIC_DIR / "derived"
+
+
+def _can_encode(fmt: str) -> bool:
+    if fmt == "avif":
+        try:
+            import pillow_avif  # noqa: F401  (registers AVIF on older Pillow)
+        except ImportError:
+            pass
+    Image.init()
+    return fmt.upper() in Image.SAVE
+
+
+def image_variants(path: Path) -> dict[str, list[tuple[int, Path]]]:
+    """Return {fmt: [(width, file), ...]} for `path`, generating missing files."""
+    digest = asset_hash(path)
+    out: dict[str, list[tuple[int, Path]]] = {}
+
+    with Image.open(path) as im:
+        im = ImageOps.exif_transpose(im)    # bake orientation in, EXIF is not copied
+        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+        widths = sorted({min(w, im.width) for w in RESPONSIVE_WIDTHS})
+
+        DERIVED.mkdir(parents=True, exist_ok=True)
+        for fmt in RESPONSIVE_FORMATS:
+            if not _can_encode(fmt):
+                continue
+            for w in widths:
+                dest = DERIVED / f"{path.stem}-{digest}-{w}.{fmt}"
+                if not dest.exists():
+                    h = round(im.height * w / im.width)
+                    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                    im.resize((w, h), Image.LANCZOS).save(
+                        tmp, format=fmt.upper(), quality=RESPONSIVE_QUALITY[fmt]
+                    )
+                    os.replace(tmp, dest)
+                out.setdefault(fmt, []).append((w, dest))
+    return out
+
+
+def _encode_variants(path: Path) -> dict[str, list[tuple[int, Path]]]:
+    try:
+        return image_variants(path)
+    except Exception:   # unreadable/unsupported file (or a decompression bomb): keep the original
+        return {}
+
+
+def event_images(ev: Event) -> list[Path]:
+    """The photos of `ev` that get responsive variants."""
+    return [p for p in (ev.hero_img, ev.story_left_img, ev.story_right_img, *ev.gallery()) if p]
+
+
+def prebuild_images(ev: Event) -> int:
+    """Encode the responsive images of `ev` in this thread; returns how many photos."""
+    if Image is None:
+        return 0
+    paths = event_images(ev)
+    jobs = shared(background_jobs)
+    for path in paths:
+        jobs.run_now(file_key("variants", path), _encode_variants, path)
+    return len(paths)
+
+
+def picture_html(path: Path | None, sizes: str, attrs: str = "") -> str:
+    """<picture> for `path` with AVIF/WebP srcsets and the original as <img> fallback.
+
+    The srcsets appear once the background encode has finished (see event_jobs()).
+    """
+    if not path:
+        return ""
+    if ASSET_SERVING != "static" or Image is None:
+        return f'<img src="{image_src(path)}" {attrs} />'
+
+    vkey = file_key("variants", path)
+    jobs = shared(background_jobs)
+    variants = jobs.result(vkey)
+    if variants is None:
+        jobs.start(vkey, _encode_variants, path)
+
+    def build() -> str:
+        sources = "".join(
+            f'<source type="image/{fmt}" sizes="{sizes}" srcset="'
+            + ", ".join(f"{asset_url(f)} {w}w" for w, f in variants[fmt])
+            + '" />'
+            for fmt in RESPONSIVE_FORMATS
+            if variants and variants.get(fmt)
+        )
+        return f'<picture>{sources}<img src="{asset_url(path)}" {attrs} /></picture>'
+
+    return asset_cache().get(file_key("picture", path) + (sizes, attrs, variants is not None), build)
+
+
+def placeholder_uri(path: Path | None) -> str:
+    """Tiny blurred preview of `path` as a data URI, "" when there is nothing to gain."""
+    if not path or ASSET_SERVING != "static" or Image is None:
+        return ""   # inline mode already ships the full image in the page
+
+    def build() -> str:
+        fmt = "webp" if _can_encode("webp") else "jpeg"
+        try:
+            with Image.open(path) as im:
+                im.draft("RGB", (LQIP_WIDTH * 8, LQIP_WIDTH * 8))   # JPEG: decode at 1/8 scale
+                im = ImageOps.exif_transpose(im).convert("RGB")
+                h = max(1, round(im.height * LQIP_WIDTH / im.width))
+                im = im.resize((LQIP_WIDTH, h), Image.LANCZOS).filter(ImageFilter.GaussianBlur(0.6))
+                buf = io.BytesIO()
+                im.save(buf, format=fmt.upper(), quality=LQIP_QUALITY)
+        except OSError:
+            return ""
+        return f"data:image/{fmt};base64,{_b64(buf.getvalue())}"
+
+    return asset_cache().get(file_key("lqip", path), build)
+
+
+def placeholder_style(path: Path | None) -> str:
+    """` style="background-image:..."` for a container whose CSS sizes it like the photo."""
+    uri = placeholder_uri(path)
+    return f' style="background-image:url({uri})"' if uri else ""
+
+
+# =========================================================
+# Music
+# The song is a plain static file: the server answers Range requests, so
+# the <audio> (preload="none") streams and seeks it only once the guest
+# taps to play. With ffmpeg on PATH, low-bitrate Opus and AAC copies are
+# transcoded in the background into static/derived/ and offered first;
+# until they exist the original mp3 is served.
+# =========================================================
+MUSIC_VARIANTS = {    # suffix: (MIME type, ffmpeg output args)
+    "opus": ("audio/ogg; codecs=opus", ["-c:a", "libopus", "-b:a", "64k", "-f", "ogg"]),
+    "m4a": ("audio/mp4", ["-c:a", "aac", "-b:a", "96k", "-movflags", "+faststart", "-f", "mp4"]),
+}
+
+
+class BackgroundJobs:
+    """Process-wide bookkeeping for slow asset jobs (one thread per job, never two for the same key).
+
+    What a job returned is kept under its key (see result()); how many of
+    an event's jobs have a result is part of its fragment cache key, so its
+    sections pick up new files (e.g. a finished transcode) on the next run.
+    """
+
+    def __init__(self) -> None:
+        self._running: set = set()
+        self._results: dict = {}
+        self._lock = threading.Lock()
+
+    def start(self, key, fn: Callable[..., object], *args) -> None:
+        with self._lock:
+            if key in self._running or key in self._results:
+                return
+            self._running.add(key)
+        threading.Thread(target=self._run, args=(key, fn, args), daemon=True).start()
+
+    def run_now(self, key, fn: Callable[..., object], *args) -> object:
+        """Run the job in the calling thread (prebuild, export) unless it already finished."""
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        self._run(key, fn, args)
+        return self.result(key)
+
+    def result(self, key) -> object:
+        """What the job for `key` returned; None while it hasn't finished."""
+        with self._lock:
+            return self._results.get(key)
+
+    def finished(self, keys) -> int:
+        """How many of `keys` have a result (it only ever grows for a given set of keys)."""
+        with self._lock:
+            return sum(1 for k in keys if k in self._results)
+
+    def pending(self) -> int:
+        """Jobs started and not finished yet."""
+        with self._lock:
+            return len(self._running)
+
+    def _run(self, key, fn: Callable[..., object], args: tuple) -> None:
+        result = None
+        try:
+            result = fn(*args)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+                if result is not None:
+                    self._results[key] = result
+
+
+@st.cache_resource(show_spinner=False)
+def background_jobs() -> BackgroundJobs:
+    return BackgroundJobs()
+
+
+def _transcode(src: Path, dest: Path, args: list[str]) -> Path | None:
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", str(src),
+             "-vn", "-map_metadata", "-1", "-ac", "2", *args, str(tmp)],
+            check=True, capture_output=True, timeout=600,
+        )
+        os.replace(tmp, dest)
+        return dest
+    except (OSError, subprocess.SubprocessError):
+        tmp.unlink(missing_ok=True)     # keep serving the original
+        return None
+
+
+def music_dest(path: Path, suffix: str) -> Path:
+    return DERIVED / f"{path.stem}-{asset_hash(path)}.{suffix}"
+
+
+def music_variants(path: Path) -> list[tuple[str, Path]]:
+    """[(mime, file)] of the transcoded copies of `path` that exist so far; starts missing ones."""
+    if shutil.which("ffmpeg") is None:
+        return []
+    out = []
+    for suffix, (mime, args) in MUSIC_VARIANTS.items():
+        dest = music_dest(path, suffix)
+        if dest.exists():
+            out.append((mime, dest))
+            continue
+        DERIVED.mkdir(parents=True, exist_ok=True)
+        background_jobs().start(dest, _transcode, path, dest, args)
+    return out
+
+
+def audio_sources(path: Path) -> list[tuple[str, str]]:
+    """[(mime, url)] for the <audio> element, smallest first; [] without music."""
+    if shared(asset_manifest).get(path) is None:
+        return []
+    if ASSET_SERVING != "static":
+        return [("audio/mpeg", audio_uri_mp3(path))]
+    return [(mime, asset_url(f)) for mime, f in music_variants(path)] + [("audio/mpeg", asset_url(path))]
+
+
+# =========================================================
+# Fragment compiler
+# A section only changes when its event config or its files change, so
+# each builder marked @compiled runs once per (config hash, asset state),
+# its output is minified, and every later rerun / session gets the cached
+# string from the AssetCache.
+# =========================================================
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s*([{};,>])\s*")
+_HTML_COMMENT = re.compile(r"<!--(?!\[).*?-->", re.S)
+_STYLE_BLOCK = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.S | re.I)
+
+
+def minify_css(css: str) -> str:
+    css = _CSS_COMMENT.sub("", css)
+    css = " ".join(css.split())
+    return _CSS_SPACE.sub(r"\1", css).replace(";}", "}")
+
+
+def minify_html(html: str) -> str:
+    """Drop comments and indentation, collapse runs of spaces.
+
+    Line breaks are kept (one blank line at most): st.markdown gives blank
+    lines meaning, and an indented line would turn into a code block.
+    """
+    html = _HTML_COMMENT.sub("", html)
+    html = _STYLE_BLOCK.sub(lambda m: m[1] + minify_css(m[2]) + m[3], html)
+    lines = [" ".join(line.split()) for line in html.splitlines()]
+    out: list[str] = []
+    for line in lines:
+        if line or (out and out[-1]):
+            out.append(line)
+    return "\n".join(out).strip()
+
+
+# Memo of the process-wide singletons, emptied when a run starts (main()):
+# each one is looked up in Streamlit's cache once per run instead of once
+# per section, and st.cache_resource.clear() still takes effect.
+_run_singletons: dict[Callable, object] = {}
+
+
+def shared(factory: Callable[[], object]):
+    obj = _run_singletons.get(factory)
+    if obj is None:
+        obj = _run_singletons[factory] = factory()
+    return obj
+
+
+def event_jobs(ev: Event) -> list:
+    """Keys of the background jobs whose output the sections of `ev` embed
+    (image variants, music transcodes); cached until its files change."""
+    manifest = shared(asset_manifest)
+
+    def build() -> list:
+        keys = [file_key("variants", p) for p in event_images(ev)]
+        if manifest.get(ev.music_file) is not None and shutil.which("ffmpeg"):
+            keys += [music_dest(ev.music_file, suffix) for suffix in MUSIC_VARIANTS]
+        return keys
+
+    return shared(asset_cache).get(("jobs", ev.digest, manifest.version(ev.assets)), build)
+
+
+def asset_state(ev: Event) -> tuple:
+    """Cheap fingerprint of everything a section may embed besides the config."""
+    manifest = shared(asset_manifest)
+    done = shared(background_jobs).finished(event_jobs(ev))
+    return (ASSET_SERVING, done, manifest.version(ev.assets), manifest.version(FONTS_SRC))
+
+
+def compiled(build: Callable[[Event], str]) -> Callable[[Event], str]:
+    """Cache `build(ev)` (minified) per event config hash + asset state."""
+    @functools.wraps(build)
+    def fragment(ev: Event) -> str:
+        key = ("fragment", build.__name__, ev.digest, asset_state(ev))
+        return shared(asset_cache).get(key, lambda: minify_html(build(ev)))
+
+    return fragment
+
+
+# =========================================================
+# Fonts
+# Cinzel + Cormorant Garamond are subset to the characters the invitation
+# renders and served as local WOFF2 (static/fonts/, font-display: swap,
+# preloaded). The subset is keyed by its character set, so editing the
+# texts above regenerates it on the next run.
+# Put the variable TTFs from Google Fonts (OFL) in assets/fonts/. Without
+# them, or without fontTools + brotli, the Google Fonts stylesheet is used.
+# =========================================================
+FONTS_SRC = ASSETS / "fonts"
+FONTS_OUT = STATIC_DIR / "fonts"
+GOOGLE_FONTS_CSS = (
+    "https://fonts.googleapis.com/css2?family=Cinzel:wght@400;600;700"
+    "&family=Cormorant+Garamond:wght@300;400;500;600;700&display=swap"
+)
+
+# Always included: what guests type in the RSVP form and what the
+# countdown / calendar draw client-side.
+FONT_BASE_CHARS = (
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    "ÁÉÍÓÚÜÑáéíóúüñ¡¿ .,;:!?'\"()&-–—/@#%+*♡"
+)
+
+
+@dataclass(frozen=True)
+class FontFace:
+    family: str
+    file: str               # in FONTS_SRC
+    weight: str             # a range for variable fonts
+    style: str = "normal"
+    preload: bool = True
+
+
+FONT_FACES = (
+    FontFace("Cinzel", "Cinzel[wght].ttf", "400 900"),
+    FontFace("Cormorant Garamond", "CormorantGaramond[wght].ttf", "300 700"),
+    FontFace("Cormorant Garamond", "CormorantGaramond-Italic[wght].ttf", "300 700", "italic", preload=False),
+)
+
+_TAGS = re.compile(r"<(style|script)\b.*?</\1>|<[^>]+>", re.S | re.I)
+
+
+def font_text(ev: Event) -> str:
+    """Visible text of every section (markup stripped), plus the form options."""
+    parts = [
+        hero_html(ev), intro_html(ev), countdown_html(ev), parents_html(ev), ceremony_html(ev),
+        dress_code_html(ev), gifts_html(ev), rsvp_title_html(ev), thanks_html(ev),
+        gallery_empty_html(), footer_html(ev), *ASISTENCIA_OPTS, PERSONAS_PLACEHOLDER,
+    ]
+    return html_lib.unescape(_TAGS.sub(" ", " ".join(parts)))
+
+
+def font_chars(ev: Event) -> str:
+    chars = set(FONT_BASE_CHARS) | set(font_text(ev))
+    return "".join(sorted(c for c in chars if c.isprintable()))
+
+
+def font_subset(face: FontFace, chars: str, slug: str = "") -> Path:
+    """WOFF2 subset of `face` covering `chars` (built once per source file + character set)."""
+    src = FONTS_SRC / face.file
+    digest = hashlib.sha1(chars.encode("utf-8") + asset_hash(src).encode()).hexdigest()[:10]
+    stem = src.stem.replace("[", "-").replace("]", "") + (f"-{slug}" if slug else "")
+    dest = FONTS_OUT / f"{stem}.{digest}.woff2"
+    if dest.exists():
+        return dest
+
+    options = ft_subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["kern", "liga", "calt", "ccmp", "locl", "mark", "mkmk"]
+    options.name_IDs = [1, 2]       # family/subfamily only
+    options.notdef_outline = True
+    font = ft_subset.load_font(str(src), options)
+    subsetter = ft_subset.Subsetter(options)
+    subsetter.populate(text=chars)
+    subsetter.subset(font)
+
+    FONTS_OUT.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    ft_subset.save_font(font, str(tmp), options)
+    os.replace(tmp, dest)
+    for old in FONTS_OUT.glob(f"{stem}.*.woff2"):    # this event's subsets for older texts
+        if old != dest:
+            old.unlink(missing_ok=True)
+    return dest
+
+
+def _font_faces(ev: Event) -> list[tuple[FontFace, str]]:
+    """[(face, url)] for the self-hosted faces, or [] to use Google Fonts."""
+    faces = [f for f in FONT_FACES if shared(asset_manifest).get(FONTS_SRC / f.file)]
+    if ft_subset is None or not faces:
+        return []
+    chars = font_chars(ev)
+
+    def build() -> list[tuple[FontFace, str]]:
+        out = []
+        for face in faces:
+            sub = font_subset(face, chars, ev.slug)
+            out.append((face, image_src(sub)))
+        return out
+
+    key = ("fonts", ASSET_SERVING, ev.slug, chars) + tuple(file_key("font", FONTS_SRC / f.file) for f in faces)
+    try:
+        return asset_cache().get(key, build)
+    except Exception:   # broken/unsupported font file: keep the page up
+        return []
+
+
+@compiled
+def font_faces_css(ev: Event) -> str:
+    """@font-face rules for the invitation fonts (or the Google Fonts @import)."""
+    faces = _font_faces(ev)
+    if not faces:
+        return f"@import url('{GOOGLE_FONTS_CSS}');"
+    return "\n".join(
+        f"@font-face {{ font-family: '{face.family}'; font-style: {face.style}; "
+        f"font-weight: {face.weight}; font-display: swap; "
+        f"src: url('{url}') format('woff2'); }}"
+        for face, url in faces
+    )
+
+
+@compiled
+def font_preload_html(ev: Event) -> str:
+    """<link rel=preload> for the faces above the fold (nothing when using Google Fonts)."""
+    return "".join(
+        f'<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin />'
+        for face, url in _font_faces(ev)
+        if face.preload and ASSET_SERVING == "static"
+    )
 
 
 def wa_link(phone_e164: str, msg: str) -> str:
     return f"https://wa.me/{phone_e164}?text={quote(msg)}"
 
 
-# ✅ NEW: Script to expand height if content is larger than default
-AUTO_RESIZE_SCRIPT = """
-<script>
-  function resizeIframe() {
-    // Get the exact height of the content
-    const height = document.body.scrollHeight;
-    // Send it to Streamlit to resize the container
-    window.parent.postMessage({type: 'streamlit:setFrameHeight', height: height}, '*');
-  }
-  // Check often to ensure it resizes correctly
-  window.addEventListener('load', resizeIframe);
-  window.addEventListener('resize', resizeIframe);
-  setInterval(resizeIframe, 500);
-</script>
-"""
+def rsvp_message(nombre: str, asistencia: str, n_personas: int, comentarios: str) -> str:
+    # Keep in sync with the static export's form script (export_static.py)
+    msg = (
+        f"Hola! Soy {nombre.strip()}. "
+        f"\nConfirmación de asistencia a su boda: {asistencia} . "
+        f"\nPersonas: {n_personas}."
+    )
+    if comentarios.strip():
+        msg += f"\n\nComentarios: {comentarios.strip()}"
+    return msg
+
 
 # =========================================================
-# Page
+# RSVP store (SQLite, WAL) with write-behind queue
+# "Confirmar" only enqueues; a single writer thread drains whatever piled
+# up and inserts it in one transaction, so a burst of confirmations right
+# after the invitation goes out costs one commit, not one per guest.
+# Triggers keep the admin totals up to date in that same transaction, so
+# the dashboard reads a handful of rows instead of scanning every RSVP.
+# =========================================================
+DATA_DIR = Path(__file__).parent / "data"
+RSVP_DB = DATA_DIR / "rsvp.sqlite3"
+RSVP_BATCH_MAX = 500
+
+
+@dataclass
+class Rsvp:
+    name: str
+    attendance: str
+    guests: int
+    comments: str
+    session_id: str
+    created_at: float
+    event: str = ""     # Event.slug ("" = default event)
+    token: str = ""     # Guest.token when opened from a personal link
+
+
+class RsvpStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rsvp (
+        id          INTEGER PRIMARY KEY,
+        name        TEXT    NOT NULL,
+        attendance  TEXT    NOT NULL,
+        guests      INTEGER NOT NULL,
+        comments    TEXT    NOT NULL DEFAULT '',
+        created_at  REAL    NOT NULL,
+        session_id  TEXT    NOT NULL DEFAULT '',
+        event       TEXT    NOT NULL DEFAULT '',
+        token       TEXT    NOT NULL DEFAULT ''
+    );
+    """
+    INDEXES = """
+    CREATE INDEX IF NOT EXISTS rsvp_event ON rsvp (event, created_at);
+    CREATE INDEX IF NOT EXISTS rsvp_created_at ON rsvp (created_at);
+    CREATE INDEX IF NOT EXISTS rsvp_name ON rsvp (name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS rsvp_session ON rsvp (session_id);
+    CREATE INDEX IF NOT EXISTS rsvp_token ON rsvp (event, token);
+    """
+    # Aggregates for the admin page. A guest with a personal link who answers
+    # again replaces their previous answer in the totals (rsvp_latest); the
+    # per-day series counts every confirmation.
+    AGGREGATES = """
+    CREATE TABLE rsvp_totals (
+        event       TEXT    NOT NULL,
+        attendance  TEXT    NOT NULL,
+        responses   INTEGER NOT NULL,
+        seats       INTEGER NOT NULL,
+        PRIMARY KEY (event, attendance)
+    );
+    CREATE TABLE rsvp_daily (
+        event       TEXT    NOT NULL,
+        day         TEXT    NOT NULL,
+        attendance  TEXT    NOT NULL,
+        responses   INTEGER NOT NULL,
+        seats       INTEGER NOT NULL,
+        PRIMARY KEY (event, day, attendance)
+    );
+    CREATE TABLE rsvp_latest (
+        event       TEXT    NOT NULL,
+        token       TEXT    NOT NULL,
+        attendance  TEXT    NOT NULL,
+        seats       INTEGER NOT NULL,
+        PRIMARY KEY (event, token)
+    );
+
+    -- Backfill from the RSVPs written before these tables existed
+    INSERT INTO rsvp_latest (event, token, attendance, seats)
+        SELECT event, token, attendance, guests FROM rsvp
+        WHERE id IN (SELECT MAX(id) FROM rsvp WHERE token != '' GROUP BY event, token);
+    INSERT INTO rsvp_totals (event, attendance, responses, seats)
+        SELECT event, attendance, COUNT(*), SUM(seats) FROM (
+            SELECT event, attendance, guests AS seats FROM rsvp WHERE token = ''
+            UNION ALL
+            SELECT event, attendance, seats FROM rsvp_latest
+        ) GROUP BY event, attendance;
+    INSERT INTO rsvp_daily (event, day, attendance, responses, seats)
+        SELECT event, date(created_at, 'unixepoch', 'localtime'), attendance, COUNT(*), SUM(guests)
+        FROM rsvp GROUP BY 1, 2, 3;
+
+    CREATE TRIGGER rsvp_aggregate AFTER INSERT ON rsvp BEGIN
+        UPDATE rsvp_totals
+           SET responses = responses - 1,
+               seats = seats - (SELECT seats FROM rsvp_latest WHERE event = NEW.event AND token = NEW.token)
+         WHERE NEW.token != ''
+           AND (event, attendance) = (SELECT event, attendance FROM rsvp_latest
+                                      WHERE event = NEW.event AND token = NEW.token);
+        INSERT INTO rsvp_latest (event, token, attendance, seats)
+            SELECT NEW.event, NEW.token, NEW.attendance, NEW.guests WHERE NEW.token != ''
+            ON CONFLICT (event, token) DO UPDATE SET attendance = excluded.attendance, seats = excluded.seats;
+        INSERT INTO rsvp_totals (event, attendance, responses, seats)
+            VALUES (NEW.event, NEW.attendance, 1, NEW.guests)
+            ON CONFLICT (event, attendance) DO UPDATE
+            SET responses = responses + 1, seats = seats + excluded.seats;
+        INSERT INTO rsvp_daily (event, day, attendance, responses, seats)
+            VALUES (NEW.event, date(NEW.created_at, 'unixepoch', 'localtime'), NEW.attendance, 1, NEW.guests)
+            ON CONFLICT (event, day, attendance) DO UPDATE
+            SET responses = responses + 1, seats = seats + excluded.seats;
+    END;
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.written = 0
+        self.failed = 0
+        self._q: queue.Queue[Rsvp | None] = queue.Queue()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(self.SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(rsvp)")}
+            for col in ("event", "token"):     # added after the first release
+                if col not in columns:
+                    db.execute(f"ALTER TABLE rsvp ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+            db.executescript(self.INDEXES)
+            if not db.execute("SELECT 1 FROM sqlite_master WHERE name = 'rsvp_aggregate'").fetchone():
+                db.executescript("BEGIN;" + self.AGGREGATES + "COMMIT;")
+        self._writer = threading.Thread(target=self._run, name="rsvp-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def add(self, rsvp: Rsvp) -> None:
+        """Queue `rsvp` for writing; never touches the disk on the caller's thread."""
+        self._q.put(rsvp)
+
+    def flush(self, timeout: float = 30) -> bool:
+        """Block until everything queued so far is written (or given up on); False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._q.all_tasks_done:
+            while self._q.unfinished_tasks:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._q.all_tasks_done.wait(left)
+        return True
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._q.put(None)
+            self._writer.join(timeout=10)
+
+    def _run(self) -> None:
+        db = self._connect()
+        stop = False
+        while not stop:
+            batch = [self._q.get()]
+            while len(batch) < RSVP_BATCH_MAX:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            rows = [r for r in batch if r is not None]
+            try:
+                if rows:
+                    self._write(db, rows)
+            except Exception as err:    # one bad batch must not stop the writer for good
+                self.failed += len(rows)
+                print(f"[rsvp] could not write {len(rows)} RSVP(s) to {self.path}: {err!r}")
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+        db.close()
+
+    def _write(self, db: sqlite3.Connection, rows: list[Rsvp]) -> None:
+        params = [
+            (r.name, r.attendance, r.guests, r.comments, r.created_at, r.session_id, r.event, r.token)
+            for r in rows
+        ]
+        for attempt in range(5):
+            try:
+                with db:
+                    db.executemany(
+                        "INSERT INTO rsvp"
+                        " (name, attendance, guests, comments, created_at, session_id, event, token)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        params,
+                    )
+                self.written += len(rows)
+                return
+            except sqlite3.OperationalError:
+                # e.g. "database is locked" by an external reader: back off and retry
+                time.sleep(0.2 * (attempt + 1))
+        self.failed += len(rows)
+        print(f"[rsvp] could not write {len(rows)} RSVP(s) to {self.path}")
+
+    def summary(self, event: str, recent: int = 20) -> dict:
+        """Admin totals for `event`: reads only the aggregate tables (+ the newest rows)."""
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5)
+        try:
+            totals = {
+                att: (n, seats)
+                for att, n, seats in db.execute(
+                    "SELECT attendance, responses, seats FROM rsvp_totals WHERE event = ?", (event,)
+                )
+            }
+            daily = db.execute(
+                "SELECT day, attendance, responses, seats FROM rsvp_daily WHERE event = ? ORDER BY day",
+                (event,),
+            ).fetchall()
+            answered = {t for (t,) in db.execute("SELECT token FROM rsvp_latest WHERE event = ?", (event,))}
+            latest = db.execute(
+                "SELECT created_at, name, attendance, guests, comments FROM rsvp"
+                " WHERE event = ? ORDER BY created_at DESC LIMIT ?",
+                (event, recent),
+            ).fetchall()
+        finally:
+            db.close()
+        return {"totals": totals, "daily": daily, "answered": answered, "latest": latest}
+
+
+@st.cache_resource(show_spinner=False)
+def rsvp_store() -> RsvpStore:
+    return RsvpStore(RSVP_DB)
+
+
+def session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
+
+
 # =========================================================
-st.set_page_config(page_title=f"{COUPLE_1} & {COUPLE_2}", page_icon="💍", layout="wide")
+# Rate limiting (token buckets per session and per client)
+# Every script run and every RSVP submit takes a token from the session's
+# bucket and from its client's (IP) bucket; an empty bucket turns the
+# request away before any section is built, so one noisy tab or bot can't
+# eat the CPU the other guests need. Buckets refill continuously.
+# =========================================================
+RATE_LIMITS = {
+    # kind: {scope: (burst, tokens per second)}
+    "run": {"session": (30, 1.0), "client": (120, 4.0)},
+    "submit": {"session": (3, 1 / 60), "client": (20, 1 / 10)},
+}
+DUPLICATE_WINDOW = 600      # seconds an identical RSVP from the same client is ignored
+# Reverse proxies in front of the app that append to X-Forwarded-For.
+# 0 = the header is ignored (anyone can send it); set it only when every
+# request goes through that many proxies that you control.
+TRUST_PROXY_HOPS = int(os.environ.get("INVITACION_TRUST_PROXY_HOPS", "0"))
+RATE_MAX_KEYS = 20_000      # buckets kept in memory (least recently used are dropped)
+
+
+class RateLimiter:
+    def __init__(self, limits: dict, max_keys: int = RATE_MAX_KEYS):
+        self.limits = limits
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, list[float]] = OrderedDict()   # -> [tokens, last refill]
+        self._seen: OrderedDict[tuple, float] = OrderedDict()            # duplicate submits
+        self._lock = threading.Lock()
+        self.rejected: dict[str, int] = {}
+
+    def allow(self, kind: str, keys: dict[str, str]) -> bool:
+        """Take one token from each scope's bucket (all or none); False = rejected."""
+        now = time.monotonic()
+        with self._lock:
+            buckets = []
+            for scope, key in keys.items():
+                burst, rate = self.limits[kind][scope]
+                bucket = self._buckets.pop((kind, scope, key), None) or [burst, now]
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                self._buckets[(kind, scope, key)] = bucket
+                buckets.append(bucket)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+            if all(b[0] >= 1 for b in buckets):
+                for b in buckets:
+                    b[0] -= 1
+                return True
+            self.rejected[kind] = self.rejected.get(kind, 0) + 1
+            return False
+
+    def duplicate(self, key: tuple, window: float = DUPLICATE_WINDOW) -> bool:
+        """True if `key` was remember()ed in the last `window` seconds (and counts it as rejected)."""
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen < window:
+                self._seen.move_to_end(key)
+                self.rejected["duplicate"] = self.rejected.get("duplicate", 0) + 1
+                return True
+            return False
+
+    def remember(self, key: tuple) -> None:
+        """Record `key` as handled; call it only once the request went through."""
+        with self._lock:
+            self._seen.pop(key, None)
+            self._seen[key] = time.monotonic()
+            while len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"buckets": len(self._buckets), **self.rejected}
+
+
+@st.cache_resource(show_spinner=False)
+def rate_limiter() -> RateLimiter:
+    return RateLimiter(RATE_LIMITS)
+
+
+def client_id() -> str:
+    """The visitor's address: the socket peer, or with TRUST_PROXY_HOPS the
+    X-Forwarded-For entry our outermost proxy appended (earlier ones are client-supplied)."""
+    try:
+        ip = st.context.ip_address
+        if TRUST_PROXY_HOPS:
+            hops = [h.strip() for h in (st.context.headers.get("X-Forwarded-For") or "").split(",") if h.strip()]
+            if len(hops) >= TRUST_PROXY_HOPS:
+                ip = hops[-TRUST_PROXY_HOPS]
+    except Exception:   # no request context (bare mode)
+        ip = None
+    return ip if isinstance(ip, str) and ip else session_id()
+
+
+def throttled(kind: str) -> bool:
+    return not shared(rate_limiter).allow(kind, {"session": session_id(), "client": client_id()})
+
+
+def fragment_rerun() -> bool:
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+# =========================================================
+# Guest list (personal links)
+# guests.csv sits next to event.toml (data/guests.csv for the default
+# event) with columns nombre, lugares, token; guest_links.py fills in the
+# tokens. A link with ?g=<token> prefills the RSVP name and caps
+# "personas" at the guest's seats. Each file is indexed by token in memory
+# once and re-read only when it changes.
+# =========================================================
+PERSONAS_MAX = 10       # without a personal link
+
+
+@dataclass(frozen=True)
+class Guest:
+    token: str
+    name: str
+    seats: int
+
+
+def read_guests(path: Path) -> dict[str, Guest]:
+    """{token: Guest} for every row of `path` that has a token (bad rows are skipped)."""
+    out: dict[str, Guest] = {}
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        reader = csv.DictReader(fh)
+        for row in reader:
+            if None in row:     # more fields than the header, e.g. an unquoted comma in a name
+                print(f"[guests] {path}:{reader.line_num}: {len(row[None])} field(s) past the header ignored")
+            row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k is not None}
+            token, name = row.get("token", ""), row.get("nombre", "")
+            if not token:
+                continue
+            try:
+                seats = int(row.get("lugares") or 1)
+            except ValueError:
+                print(f"[guests] {path}:{reader.line_num}: 'lugares' is not a number")
+                continue
+            out[token] = Guest(token=token, name=name, seats=max(1, seats))
+    return out
+
+
+class GuestIndex:
+    """Per-file {token: Guest} dicts, reloaded when the file's mtime changes."""
+
+    def __init__(self) -> None:
+        self._items: dict[Path, tuple[int, dict[str, Guest]]] = {}
+        self._lock = threading.Lock()
+
+    def guests(self, path: Path) -> dict[str, Guest]:
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        with self._lock:
+            hit = self._items.get(path)
+        if not hit or hit[0] != mtime:
+            try:
+                hit = (mtime, read_guests(path))
+            except (OSError, csv.Error) as err:
+                print(f"[guests] could not read {path}: {err}")
+                return {}
+            with self._lock:
+                self._items[path] = hit
+        return hit[1]
+
+    def lookup(self, path: Path, token: str) -> Guest | None:
+        return self.guests(path).get(token) if token else None
+
+    def drop(self, path: Path) -> None:
+        with self._lock:
+            self._items.pop(path, None)
+
+
+@st.cache_resource(show_spinner=False)
+def guest_index() -> GuestIndex:
+    return GuestIndex()
+
 
-hero_uri = data_uri(HERO_IMG) if HERO_IMG else ""
-bg_uri = data_uri(BG_IMG) if BG_IMG else ""
-left_uri = data_uri(STORY_LEFT_IMG) if STORY_LEFT_IMG else ""
-right_uri = data_uri(STORY_RIGHT_IMG) if STORY_RIGHT_IMG else ""
-music_uri = audio_uri_mp3(MUSIC_FILE) if MUSIC_FILE.exists() else ""
+# =========================================================
+# Client component
+# Hero, countdown and gallery are rendered by one declared component
+# (frontend/): its CSS/JS are static files, fetched once per tab and shared
+# by every instance, and an instance only re-renders when its props change.
+# The markup itself still comes from the section builders below.
+# =========================================================
+FRONTEND_DIR = Path(__file__).parent / "frontend"
+_invitation_component = components.declare_component("invitacion", path=str(FRONTEND_DIR))
 
-gal_paths = gallery_files(8)
-gal_uris = [data_uri(p) for p in gal_paths]
+
+def theme_vars(ev: Event) -> dict[str, str]:
+    return {"text": ev.theme_text, "accent": ev.theme_accent, "overlay": ev.theme_overlay}
+
+
+def theme_vars_css(ev: Event) -> str:
+    return ":root {" + "".join(f" --inv-{k}: {v};" for k, v in theme_vars(ev).items()) + " }"
+
+
+def invitation_component(
+    html: str, ev: Event, *, key: str, height: int | None = None, reveal: bool = False
+) -> None:
+    """Render `html` in an instance of the component.
+
+    The client never sets a component value: each one would rerun the whole
+    script (and spend a rate-limit token) for state the server doesn't use.
+    """
+    _invitation_component(
+        html=html, theme=theme_vars(ev), fonts=font_faces_css(ev), height=height, reveal=reveal,
+        key=key, default=None,
+    )
+
+# =========================================================
+# Sections
+# Each builder returns the HTML of one part of the invitation.
+# main() lays them out with Streamlit; export_static.py reuses them.
+# =========================================================
 
 # Global CSS
-st.markdown(
-    f"""
+@compiled
+def global_css(ev: Event) -> str:
+    bg_uri = image_src(ev.bg_img)
+    return f"""
+{font_preload_html(ev)}
 <style>
 /* ✅ Wedding invitation fonts (apply to ALL invitation) */
-@import url('https://fonts.googleapis.com/css2?family=Cinzel:wght@400;600;700&family=Cormorant+Garamond:wght@300;400;500;600;700&display=swap');
+{font_faces_css(ev)}
 
 html, body, [class*="css"] {{
   font-family: 'Cormorant Garamond', serif;
 }}
 
 .stApp {{
-  background: linear-gradient({THEME_OVERLAY}, {THEME_OVERLAY}){"," if bg_uri else ""} {f'url("{bg_uri}")' if bg_uri else ""};
+  background: linear-gradient({ev.theme_overlay}, {ev.theme_overlay}){"," if bg_uri else ""} {f'url("{bg_uri}")' if bg_uri else ""};
   background-size: cover;
   background-attachment: fixed;
   background-position: center center;
@@ -202,7 +1820,7 @@ html, body, [class*="css"] {{
 
 .h-serif {{
   font-family: 'Cinzel', serif;
-  color: {THEME_TEXT};
+  color: {ev.theme_text};
 }}
 
 .p-muted {{
@@ -217,8 +1835,8 @@ html, body, [class*="css"] {{
 }}
 
 .card {{
-  background: {CARD_BG};
-  color: {CARD_TEXT};
+  background: {ev.card_bg};
+  color: {ev.card_text};
   border-radius: 16px;
   padding: 18px 18px;
   box-shadow: 0 10px 26px rgba(0,0,0,0.18);
@@ -239,7 +1857,7 @@ html, body, [class*="css"] {{
 }}
 
 .gold {{
-  color: {THEME_ACCENT};
+  color: {ev.theme_accent};
 }}
 
 .icon-big {{
@@ -247,6 +1865,12 @@ html, body, [class*="css"] {{
   line-height: 1;
 }}
 
+.story-img {{
+  width: 100%;
+  height: auto;
+  display: block;
+}}
+
 /* ✅ RSVP form styling (transparent card + form look) */
 div[data-testid="stForm"] {{
   background: transparent !important;
@@ -402,84 +2026,18 @@ div[data-testid="stFormSubmitButton"] button:hover {{
   }}
 }}
 </style>
-""",
-    unsafe_allow_html=True,
-)
-
-# ✅ Fancy scroll animations JS (targets parent DOM)
-components.html(
-    """
-<script>
-(function () {
-  try {
-    const doc = window.parent.document;
-
-    const obs = new IntersectionObserver((entries) => {
-      entries.forEach((e) => {
-        if (e.isIntersecting) {
-          e.target.classList.add("reveal-in");
-          obs.unobserve(e.target);
-        }
-      });
-    }, {
-      threshold: 0.14,
-      rootMargin: "0px 0px -12% 0px"
-    });
-
-    function staggerChildren(el) {
-      const kids = Array.from(el.querySelectorAll(":scope > *"));
-      kids.forEach((k, i) => {
-        k.classList.add("reveal-child");
-        k.style.setProperty("--d", `${Math.min(i, 8) * 90}ms`);
-      });
-    }
-
-    function setup() {
-      const sections = Array.from(doc.querySelectorAll(".section"));
-      const cards = Array.from(doc.querySelectorAll(".card"));
-
-      sections.forEach((el, i) => {
-        if (!el.classList.contains("reveal-target")) {
-          el.classList.add("reveal-target");
-          el.classList.add(i % 2 === 0 ? "reveal-left" : "reveal-right");
-          staggerChildren(el);
-          obs.observe(el);
-        }
-      });
-
-      cards.forEach((el) => {
-        if (!el.classList.contains("reveal-target")) {
-          el.classList.add("reveal-target", "reveal-pop");
-          staggerChildren(el);
-          obs.observe(el);
-        }
-      });
-    }
-
-    setup();
-    setTimeout(setup, 450);
-    setTimeout(setup, 1200);
-
-    const mo = new MutationObserver(() => setup());
-    mo.observe(doc.body, { childList: true, subtree: true });
-
-  } catch (err) {
-    console.warn("Fancy scroll reveal init failed:", err);
-  }
-})();
-</script>
-""",
-    height=1,
-)
+"""
 
 # =========================================================
-# HERO with AUTOPLAY (best-effort)
+# HERO (music streams on the first tap)
 # =========================================================
-if not hero_uri:
-    st.error("Missing hero image. Add one of: assets/hero.jpg | hero.jpeg | hero.png | hero.webp")
-else:
-    hero_html = f"""
-    <div id="hero" style="
+@compiled
+def hero_html(ev: Event) -> str:
+    music_sources = "".join(f'<source src="{url}" type="{mime}" />' for mime, url in audio_sources(ev.music_file))
+    hero_picture = picture_html(ev.hero_img, "100vw", 'alt="" fetchpriority="high"')
+    lqip = placeholder_uri(ev.hero_img)
+    return f"""
+    <div id="hero" data-inv="hero" style="
       width:100%;
       height:92vh;
       min-height:550px;
@@ -487,13 +2045,11 @@ else:
       border-radius:24px;
       overflow:hidden;
       position:relative;
-      background-image:
-        linear-gradient({THEME_OVERLAY}, {THEME_OVERLAY}),
-        url('{hero_uri}');
-      background-size:cover;
-      background-position:center 38%;
+      background-color:#000;{f" background-image:url({lqip});" if lqip else ""}
       box-shadow: 0 14px 40px rgba(0,0,0,0.35);
     ">
+      {hero_picture}
+      <div style="position:absolute; inset:0; background:{ev.theme_overlay};"></div>
 
       <div style="
         position:absolute; inset:0;
@@ -503,16 +2059,16 @@ else:
 
         text-align:center; padding: 20px;
       ">
-        <div style="font-family:'Cinzel',serif; font-size: clamp(44px, 6vw, 92px); font-weight:700; color:{THEME_TEXT}; letter-spacing:1px;">
-          {COUPLE_1} <span style="color:{THEME_ACCENT}; font-weight:600;">&</span> {COUPLE_2}
+        <div style="font-family:'Cinzel',serif; font-size: clamp(44px, 6vw, 92px); font-weight:700; color:{ev.theme_text}; letter-spacing:1px;">
+          {ev.couple_1} <span style="color:{ev.theme_accent}; font-weight:600;">&</span> {ev.couple_2}
         </div>
 
         <div style="margin-top:10px; font-size: 14px; letter-spacing:2px; color: rgba(245,240,232,0.9); font-weight:600;">
-          {HERO_SUBTITLE}
+          {ev.hero_subtitle}
         </div>
 
         <div style="margin-top:14px; font-size: 20px; color: rgba(245,240,232,0.95);">
-          {HERO_DATE_TEXT}
+          {ev.hero_date_text}
         </div>
 
         <div id="tapNote" style="
@@ -541,186 +2097,77 @@ else:
         >🔈</button>
       </div>
 
-      <audio id="bgm" {'src="' + music_uri + '"' if music_uri else ''} autoplay loop playsinline></audio>
-
-      <script>
-        const btn = document.getElementById("musicBtn");
-        const audio = document.getElementById("bgm");
-        const note = document.getElementById("tapNote");
-
-        let playing = false;
-
-        function setIcon() {{
-          btn.innerText = playing ? "🔊" : "🔈";
-        }}
-
-        function showNote(show) {{
-          note.style.display = show ? "inline-block" : "none";
-        }}
-
-        async function tryPlay(unmuted) {{
-          if (!audio || !audio.src) {{
-            showNote(false);
-            return;
-          }}
-          audio.loop = true;
-          audio.muted = !unmuted;
-
-          try {{
-            await audio.play();
-            playing = true;
-            setIcon();
-            showNote(false);
-          }} catch (e) {{
-            playing = false;
-            setIcon();
-            showNote(true);
-          }}
-        }}
-
-        window.addEventListener("load", () => {{
-          tryPlay(false); // muted autoplay
-        }});
-
-        document.addEventListener("click", () => {{
-          tryPlay(true);
-        }}, {{ once: true }});
-
-        btn.addEventListener("click", async (e) => {{
-          e.stopPropagation();
-          if (!audio || !audio.src) {{
-            alert("No hay música cargada. Sube assets/song.mp3");
-            return;
-          }}
-          if (!playing) {{
-            await tryPlay(true);
-          }} else {{
-            audio.pause();
-            playing = false;
-            setIcon();
-          }}
-        }});
-
-        setIcon();
-      </script>
+      <audio id="bgm" preload="none" loop playsinline>{music_sources}</audio>
+
     </div>
     """
-    # ✅ NO CHANGE to HERO height or script (avoids deletion issue)
-    components.html(hero_html, height=600)
 
 # =========================================================
 # INTRO
 # =========================================================
-st.markdown(
-    f"""
+@compiled
+def intro_html(ev: Event) -> str:
+    return f"""
 <div class="section">
   <div class="small-center">
-    <div class="h-serif" style="font-size:56px; font-weight:700;">{INTRO_TITLE}</div>
+    <div class="h-serif" style="font-size:56px; font-weight:700;">{ev.intro_title}</div>
     <div class="p-muted" style="max-width: 900px; margin: 14px auto 0; font-size:18px;">
-      {INTRO_TEXT}
+      {ev.intro_text}
     </div>
   </div>
 </div>
-""",
-    unsafe_allow_html=True,
-)
+"""
 
 # =========================================================
 # STORY + CALENDAR + COUNTDOWN (center)
 # =========================================================
-countdown_html = f"""
-<style>
-  html, body {{ margin:0; padding:0; }}
-
-  .cal-title {{
-    text-align:center;
-    font-family:'Cinzel',serif;
-    color: {THEME_TEXT};
-    margin-bottom: 10px;
-  }}
-  .cal-title .big {{
-    font-size: 44px;
-    font-weight: 700;
-    line-height: 1;
-  }}
-  .cal-title .small {{
-    font-size: 28px;
-    font-weight: 400;
-    opacity: .95;
-  }}
+MONTHS_ES = (
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
+)
 
-  .cal-box {{
-    width:100%;
-    max-width: 520px;
-    margin: 0 auto 14px auto;
-    padding: 14px 14px 10px 14px;
-    box-sizing: border-box;
-    border: 2px solid rgba(215,194,154,0.55);
-    border-radius: 14px;
-    background: rgba(0,0,0,0.18);
-  }}
 
-  .dow {{
-    display:grid;
-    grid-template-columns: repeat(7, 1fr);
-    gap: 8px;
-    margin-bottom: 8px;
-    font-family:'Cormorant Garamond',serif;
-    color: rgba(245,240,232,0.85);
-    font-size: 14px;
-    letter-spacing: .6px;
-    text-align:center;
-  }}
+def countdown_parts(target: datetime, now: datetime) -> tuple[int, int, int, int]:
+    """(days, hours, minutes, seconds) left until `target`, zeros once it has passed."""
+    left = max(0, int((target - now).total_seconds()))
+    days, left = divmod(left, 86400)
+    hrs, left = divmod(left, 3600)
+    return (days, hrs, *divmod(left, 60))
 
-  .grid {{
-    display:grid;
-    grid-template-columns: repeat(7, 1fr);
-    gap: 8px;
-  }}
 
-  .cell {{
-    height: 34px;
-    border-radius: 10px;
-    display:flex;
-    align-items:center;
-    justify-content:center;
-    font-family:'Cormorant Garamond',serif;
-    color: rgba(245,240,232,0.92);
-    font-size: 15px;
-    background: rgba(255,255,255,0.03);
-  }}
+def countdown_html(ev: Event) -> str:
+    """Calendar + countdown as of now; the script only keeps the numbers live."""
+    html = countdown_frame(ev)
+    for field_id, value in zip("dhms", countdown_parts(ev.starts_at, datetime.now(timezone.utc))):
+        html = html.replace(f"%%{field_id}%%", str(value), 1)
+    return html
 
-  .empty {{
-    background: transparent;
-  }}
 
-  .target {{
-    position: relative;
-    border: 2px solid rgba(215,194,154,0.95);
-    background: rgba(215,194,154,0.10);
-    font-weight: 600;
-  }}
+@compiled
+def countdown_frame(ev: Event) -> str:
+    """Everything but the numbers (%%d%% ... %%s%%), which only change per event.
 
-  .target::after {{
-    content: "♡";
-    position: absolute;
-    top: -10px;
-    right: -8px;
-    font-size: 14px;
-    color: rgba(215,194,154,0.95);
-  }}
-</style>
+    The number fields are marked data-live: the component ignores them when
+    it compares props, so a rerun with new numbers doesn't rebuild the DOM.
+    """
+    target = ev.starts_at
+    start_dow, n_days = calendar.monthrange(target.year, target.month)   # Monday = 0
+    cells = '<div class="cell empty"></div>' * start_dow + "".join(
+        f'<div class="cell{" target" if d == target.day else ""}">{d}</div>' for d in range(1, n_days + 1)
+    )
+    return f"""
+<div data-inv="countdown" data-target="{target.isoformat()}">
 
 <div class="cal-title">
-  <div class="big" id="calDay">--</div>
-  <div class="small"><span id="calMonthName">--</span> <span style="opacity:.85;">de</span> <span id="calYear">----</span></div>
+  <div class="big">{target.day:02d}</div>
+  <div class="small"><span>{MONTHS_ES[target.month - 1]}</span> <span style="opacity:.85;">de</span> <span>{target.year}</span></div>
 </div>
 
 <div class="cal-box">
   <div class="dow">
     <div>Lu</div><div>Ma</div><div>Mi</div><div>Ju</div><div>Vi</div><div>Sá</div><div>Do</div>
   </div>
-  <div class="grid" id="calGrid"></div>
+  <div class="grid">{cells}</div>
 </div>
 
 <div style="
@@ -732,95 +2179,31 @@ countdown_html = f"""
   border-radius: 14px;
   padding: 14px 10px;
   background: rgba(0,0,0,0.25);
-  color: {THEME_TEXT};
+  color: {ev.theme_text};
   font-family: 'Cinzel', serif;
 ">
   <div style="display:flex; justify-content:space-around; gap:10px; text-align:center;">
-    <div><div id="d" style="font-size:26px; font-weight:700;">--</div><div style="opacity:.9;">Días</div></div>
-    <div><div id="h" style="font-size:26px; font-weight:700;">--</div><div style="opacity:.9;">Hrs</div></div>
-    <div><div id="m" style="font-size:26px; font-weight:700;">--</div><div style="opacity:.9;">Mins</div></div>
-    <div><div id="s" style="font-size:26px; font-weight:700;">--</div><div style="opacity:.9;">Segs</div></div>
+    <div><div id="d" data-live style="font-size:26px; font-weight:700;">%%d%%</div><div style="opacity:.9;">Días</div></div>
+    <div><div id="h" data-live style="font-size:26px; font-weight:700;">%%h%%</div><div style="opacity:.9;">Hrs</div></div>
+    <div><div id="m" data-live style="font-size:26px; font-weight:700;">%%m%%</div><div style="opacity:.9;">Mins</div></div>
+    <div><div id="s" data-live style="font-size:26px; font-weight:700;">%%s%%</div><div style="opacity:.9;">Segs</div></div>
   </div>
 </div>
 
-<script>
-  const targetDate = new Date("{EVENT_DATE_TIME.replace(" ", "T")}");
-  const targetMs = targetDate.getTime();
-
-  const monthNames = ["Enero","Febrero","Marzo","Abril","Mayo","Junio","Julio","Agosto","Septiembre","Octubre","Noviembre","Diciembre"];
-
-  const y = targetDate.getFullYear();
-  const m = targetDate.getMonth();
-  const day = targetDate.getDate();
-
-  document.getElementById("calDay").innerText = String(day).padStart(2,"0");
-  document.getElementById("calMonthName").innerText = monthNames[m];
-  document.getElementById("calYear").innerText = y;
-
-  const first = new Date(y, m, 1);
-  const startDow = (first.getDay() + 6) % 7;
-  const daysInMonth = new Date(y, m + 1, 0).getDate();
-
-  const grid = document.getElementById("calGrid");
-  grid.innerHTML = "";
-
-  for (let i=0; i<startDow; i++) {{
-    const div = document.createElement("div");
-    div.className = "cell empty";
-    grid.appendChild(div);
-  }}
-
-  for (let d=1; d<=daysInMonth; d++) {{
-    const div = document.createElement("div");
-    div.className = "cell" + (d === day ? " target" : "");
-    div.innerText = d;
-    grid.appendChild(div);
-  }}
+</div>
+"""
 
-  function tick() {{
-    const now = new Date().getTime();
-    let diff = Math.max(0, targetMs - now);
-
-    const days = Math.floor(diff / (1000*60*60*24));
-    diff -= days * (1000*60*60*24);
-    const hrs = Math.floor(diff / (1000*60*60));
-    diff -= hrs * (1000*60*60);
-    const mins = Math.floor(diff / (1000*60));
-    diff -= mins * (1000*60);
-    const secs = Math.floor(diff / 1000);
-
-    document.getElementById("d").innerText = days;
-    document.getElementById("h").innerText = hrs;
-    document.getElementById("m").innerText = mins;
-    document.getElementById("s").innerText = secs;
-  }}
 
-  tick();
-  setInterval(tick, 1000);
-</script>
-"""
+def story_html(path: Path | None) -> str:
+    return picture_html(path, STORY_SIZES, 'class="story-img" alt="" loading="lazy"')
 
-colL, colC, colR = st.columns([1.2, 1.0, 1.2], vertical_alignment="center", gap="large")
-with colL:
-    if left_uri:
-        st.image(left_uri, use_container_width=True)
-    else:
-        st.info("Add story_left.jpg/.jpeg/.png/.webp in assets/")
-with colC:
-    # ✅ HEIGHT=540 + AUTO_RESIZE_SCRIPT
-    # Safe height for mobile (prevents gap) but tall enough for desktop (prevents cropping)
-    components.html(countdown_html + AUTO_RESIZE_SCRIPT, height=540)
-with colR:
-    if right_uri:
-        st.image(right_uri, use_container_width=True)
-    else:
-        st.info("Add story_right.jpg/.jpeg/.png/.webp in assets/")
 
 # =========================================================
 # PARENTS / PADRINOS
 # =========================================================
-st.markdown(
-f"""<div class="section">
+@compiled
+def parents_html(ev: Event) -> str:
+    return f"""<div class="section">
 <div class="h-serif small-center" style="font-size:35px; font-weight:600;">
 ¡Celebra con nosotros este día tan maravilloso!
 </div>
@@ -832,58 +2215,54 @@ f"""<div class="section">
 <div style="flex:1; min-width: 220px; text-align:center;">
 <div class="h-serif" style="font-size:22px; font-weight:600;">Padres de la Novia</div>
 <div class="p-muted" style="margin-top:10px; font-size:18px;">
-{PARENTS_NOVIA[0]}<br><span class="gold">&</span><br>{PARENTS_NOVIA[1]}
+{ev.parents_novia[0]}<br><span class="gold">&</span><br>{ev.parents_novia[1]}
 </div>
 </div>
 
 <div style="flex:1; min-width: 220px; text-align:center;">
 <div class="h-serif" style="font-size:22px; font-weight:600;">Padres del Novio</div>
 <div class="p-muted" style="margin-top:10px; font-size:18px;">
-{PARENTS_NOVIO[0]}<br><span class="gold">&</span><br>{PARENTS_NOVIO[1]}
+{ev.parents_novio[0]}<br><span class="gold">&</span><br>{ev.parents_novio[1]}
 </div>
 </div>
 
 <div style="flex:1; min-width: 220px; text-align:center;">
 <div class="h-serif" style="font-size:22px; font-weight:600;">Padrinos</div>
 <div class="p-muted" style="margin-top:10px; font-size:18px;">
-{PADRINOS[0]}<br><span class="gold">&</span><br>{PADRINOS[1]}
+{ev.padrinos[0]}<br><span class="gold">&</span><br>{ev.padrinos[1]}
 </div>
 </div>
 
 </div>
-</div>""",
-unsafe_allow_html=True,
-)
+</div>"""
 
 # =========================================================
 # CEREMONIA / RECEPCION
 # =========================================================
-c2 = st.container()
-with c2:
-    st.markdown(
-        f"""
+@compiled
+def ceremony_html(ev: Event) -> str:
+    return f"""
 <div class="card small-center">
   <div class="icon-big">🥂</div>
   <div class="h-serif" style="font-size:28px; font-weight:600; margin-top:6px;">
-    {RECEPCION.title}
+    {ev.ceremonia.title}
   </div>
   <div style="margin-top:12px; font-size:18px;">
-    <div><b>{RECEPCION.date_str}</b></div>
-    <div style="margin-top:2px;">{RECEPCION.time_str}</div>
-    <div style="margin-top:12px;">{RECEPCION.place}</div>
+    <div><b>{ev.ceremonia.date_str}</b></div>
+    <div style="margin-top:2px;">{ev.ceremonia.time_str}</div>
+    <div style="margin-top:12px;">{ev.ceremonia.place}</div>
   </div>
   <div style="margin-top:14px;">
-    <a class="btn-link" href="{RECEPCION.maps_url}" target="_blank">Ver mapa!</a>
+    <a class="btn-link" href="{ev.ceremonia.maps_url}" target="_blank">Ver mapa!</a>
   </div>
 </div>
-""",
-        unsafe_allow_html=True,
-    )
+"""
 
 # =========================================================
 # DRESS CODE ✅ (icons rendered correctly)
 # =========================================================
-DRESS_ICON_SVG = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">
+def dress_icon_svg(ev: Event) -> str:
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">
   <path d="M22 18
            Q26 12 32 12
            Q38 12 42 18
@@ -893,45 +2272,48 @@ DRESS_ICON_SVG = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64"
            L26 26
            Z"
         fill="none"
-        stroke="{THEME_TEXT}"
+        stroke="{ev.theme_text}"
         stroke-width="2.8"
         stroke-linecap="round"
         stroke-linejoin="round"/>
   <path d="M27 16 Q32 19 37 16"
         fill="none"
-        stroke="{THEME_ACCENT}"
+        stroke="{ev.theme_accent}"
         stroke-width="2.2"
         stroke-linecap="round"
         opacity="0.95"/>
   <path d="M26 26 Q32 30 38 26"
         fill="none"
-        stroke="{THEME_ACCENT}"
+        stroke="{ev.theme_accent}"
         stroke-width="2.2"
         stroke-linecap="round"
         opacity="0.9"/>
 </svg>"""
 
-TUX_ICON_SVG = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">
-<path d="M26 12h12" fill="none" stroke="{THEME_TEXT}" stroke-width="2.6" stroke-linecap="round"/>
-<path d="M26 12l6 10 6-10" fill="none" stroke="{THEME_ACCENT}" stroke-width="2.6" stroke-linecap="round" stroke-linejoin="round"/>
-<path d="M20 20l6-8 6 10-6 10-6-8" fill="none" stroke="{THEME_TEXT}" stroke-width="2.6" stroke-linejoin="round"/>
-<path d="M44 20l-6-8-6 10 6 10 6-8" fill="none" stroke="{THEME_TEXT}" stroke-width="2.6" stroke-linejoin="round"/>
-<path d="M28 22v30c0 2 8 2 8 0V22" fill="none" stroke="{THEME_TEXT}" stroke-width="2.6" stroke-linecap="round"/>
-<path d="M28 32h8" fill="none" stroke="{THEME_ACCENT}" stroke-width="2.2" stroke-linecap="round" opacity="0.9"/>
-<path d="M24 54h16" fill="none" stroke="{THEME_TEXT}" stroke-width="2.6" stroke-linecap="round" opacity="0.9"/>
+def tux_icon_svg(ev: Event) -> str:
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 64 64">
+<path d="M26 12h12" fill="none" stroke="{ev.theme_text}" stroke-width="2.6" stroke-linecap="round"/>
+<path d="M26 12l6 10 6-10" fill="none" stroke="{ev.theme_accent}" stroke-width="2.6" stroke-linecap="round" stroke-linejoin="round"/>
+<path d="M20 20l6-8 6 10-6 10-6-8" fill="none" stroke="{ev.theme_text}" stroke-width="2.6" stroke-linejoin="round"/>
+<path d="M44 20l-6-8-6 10 6 10 6-8" fill="none" stroke="{ev.theme_text}" stroke-width="2.6" stroke-linejoin="round"/>
+<path d="M28 22v30c0 2 8 2 8 0V22" fill="none" stroke="{ev.theme_text}" stroke-width="2.6" stroke-linecap="round"/>
+<path d="M28 32h8" fill="none" stroke="{ev.theme_accent}" stroke-width="2.2" stroke-linecap="round" opacity="0.9"/>
+<path d="M24 54h16" fill="none" stroke="{ev.theme_text}" stroke-width="2.6" stroke-linecap="round" opacity="0.9"/>
 </svg>"""
 
-dress_icon_uri = "data:image/svg+xml;base64," + base64.b64encode(DRESS_ICON_SVG.encode("utf-8")).decode("utf-8")
-tux_icon_uri = "data:image/svg+xml;base64," + base64.b64encode(TUX_ICON_SVG.encode("utf-8")).decode("utf-8")
 
-st.markdown(
-    textwrap.dedent(f"""<div class="section">
+
+@compiled
+def dress_code_html(ev: Event) -> str:
+    dress_icon_uri = svg_uri(dress_icon_svg(ev))
+    tux_icon_uri = svg_uri(tux_icon_svg(ev))
+    return textwrap.dedent(f"""<div class="section">
   <div class="h-serif small-center" style="font-size:40px; font-weight:600; text-transform:uppercase; letter-spacing:1px;">
     CÓDIGO DE VESTIMENTA.
   </div>
 
   <div class="h-serif small-center" style="margin-top:14px; font-size:30px; font-weight:500; letter-spacing:6px; text-transform:uppercase; opacity:.95;">
-    {DRESS_CODE}
+    {ev.dress_code}
   </div>
 
   <div style="margin-top:18px; display:flex; justify-content:center; align-items:center; gap:46px;">
@@ -940,50 +2322,51 @@ st.markdown(
   </div>
 
   <div class="small-center p-muted" style="margin-top:18px; font-size:22px; line-height:1.25;">
-    {DRESS_NOTE}
+    {ev.dress_note}
   </div>
-</div>""").lstrip(),
-    unsafe_allow_html=True,
-)
+</div>""").lstrip()
 
 # =========================================================
 # REGALOS ✅ (new section)
 # =========================================================
-GIFT_ICON_SVG = f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 240 130">
+def gift_icon_svg(ev: Event) -> str:
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 240 130">
   <g fill="none" stroke-linecap="round" stroke-linejoin="round">
-    <rect x="22" y="46" width="86" height="58" rx="10" stroke="{THEME_ACCENT}" stroke-width="2.6" opacity="0.95"/>
-    <path d="M22 54 L65 84 L108 54" stroke="{THEME_ACCENT}" stroke-width="2.6" opacity="0.95"/>
-    <path d="M22 104 L60 78" stroke="{THEME_ACCENT}" stroke-width="2.2" opacity="0.6"/>
-    <path d="M108 104 L70 78" stroke="{THEME_ACCENT}" stroke-width="2.2" opacity="0.6"/>
+    <rect x="22" y="46" width="86" height="58" rx="10" stroke="{ev.theme_accent}" stroke-width="2.6" opacity="0.95"/>
+    <path d="M22 54 L65 84 L108 54" stroke="{ev.theme_accent}" stroke-width="2.6" opacity="0.95"/>
+    <path d="M22 104 L60 78" stroke="{ev.theme_accent}" stroke-width="2.2" opacity="0.6"/>
+    <path d="M108 104 L70 78" stroke="{ev.theme_accent}" stroke-width="2.2" opacity="0.6"/>
 
     <path d="M65 75
              C62 69 54 69 54 76
              C54 83 65 90 65 90
              C65 90 76 83 76 76
              C76 69 68 69 65 75 Z"
-          fill="{THEME_ACCENT}" opacity="0.55" stroke="none"/>
+          fill="{ev.theme_accent}" opacity="0.55" stroke="none"/>
 
-    <rect x="132" y="46" width="86" height="58" rx="10" stroke="{THEME_ACCENT}" stroke-width="2.6" opacity="0.95"/>
-    <path d="M132 54 L175 84 L218 54" stroke="{THEME_ACCENT}" stroke-width="2.6" opacity="0.95"/>
-    <path d="M132 104 L170 78" stroke="{THEME_ACCENT}" stroke-width="2.2" opacity="0.6"/>
-    <path d="M218 104 L180 78" stroke="{THEME_ACCENT}" stroke-width="2.2" opacity="0.6"/>
+    <rect x="132" y="46" width="86" height="58" rx="10" stroke="{ev.theme_accent}" stroke-width="2.6" opacity="0.95"/>
+    <path d="M132 54 L175 84 L218 54" stroke="{ev.theme_accent}" stroke-width="2.6" opacity="0.95"/>
+    <path d="M132 104 L170 78" stroke="{ev.theme_accent}" stroke-width="2.2" opacity="0.6"/>
+    <path d="M218 104 L180 78" stroke="{ev.theme_accent}" stroke-width="2.2" opacity="0.6"/>
 
     <path d="M175 75
              C172 69 164 69 164 76
              C164 83 175 90 175 90
              C175 90 186 83 186 76
              C186 69 178 69 175 75 Z"
-          fill="{THEME_ACCENT}" opacity="0.55" stroke="none"/>
+          fill="{ev.theme_accent}" opacity="0.55" stroke="none"/>
 
-    <path d="M60 46 Q65 36 75 36" stroke="{THEME_TEXT}" stroke-width="2.0" opacity="0.25"/>
-    <path d="M180 46 Q175 36 165 36" stroke="{THEME_TEXT}" stroke-width="2.0" opacity="0.25"/>
+    <path d="M60 46 Q65 36 75 36" stroke="{ev.theme_text}" stroke-width="2.0" opacity="0.25"/>
+    <path d="M180 46 Q175 36 165 36" stroke="{ev.theme_text}" stroke-width="2.0" opacity="0.25"/>
   </g>
 </svg>"""
 
-gift_icon_uri = "data:image/svg+xml;base64," + base64.b64encode(GIFT_ICON_SVG.encode("utf-8")).decode("utf-8")
 
-st.markdown(
-    textwrap.dedent(f"""<div class="section">
+
+@compiled
+def gifts_html(ev: Event) -> str:
+    gift_icon_uri = svg_uri(gift_icon_svg(ev))
+    return textwrap.dedent(f"""<div class="section">
   <div class="h-serif small-center" style="font-size:48px; font-weight:600;">Regalos</div>
 
   <div class="small-center p-muted" style="margin-top: 16px; font-size:24px; font-style: italic; line-height: 1.25;">
@@ -1000,175 +2383,125 @@ st.markdown(
 
   <div class="small-center p-muted" style="margin-top: 22px; font-size:22px; line-height: 1.25;">
     Durante la recepción habrá una caja donde se podrá depositar
-    <b style="color:{THEME_TEXT};">sobrecitos con efectivo</b>.
+    <b style="color:{ev.theme_text};">sobrecitos con efectivo</b>.
   </div>
-</div>""").lstrip(),
-    unsafe_allow_html=True,
-)
+</div>""").lstrip()
 
 # =========================================================
 # RSVP FORM  ✅ (dynamic enable/disable)
 # =========================================================
-st.markdown(
-    f"""
+@compiled
+def rsvp_title_html(ev: Event) -> str:
+    return f"""
 <div class="section">
-  <div class="h-serif small-center" style="font-size:34px; font-weight:600;">{RSVP_TITLE} <span class="gold">🟢</span></div>
+  <div class="h-serif small-center" style="font-size:34px; font-weight:600;">{ev.rsvp_title} <span class="gold">🟢</span></div>
 </div>
-""",
-    unsafe_allow_html=True,
-)
+"""
+
+
+ASISTENCIA_OPTS = ["Selecciona una opción", "Sí", "No"]
+PERSONAS_PLACEHOLDER = "Selecciona el número de personas"
+
+
+@st.fragment
+def rsvp_form(ev: Event, guest: Guest | None = None) -> None:
+    # Runs as a fragment: interacting with the form reruns only this function,
+    # not the hero / countdown / gallery. "¿Asistirás?" stays outside st.form so
+    # changing it can enable "personas"; the rest is only sent on "Confirmar".
+    if fragment_rerun():
+        if throttled("run"):
+            st.warning("Vas muy rápido 🙂 Espera unos segundos e inténtalo de nuevo.")
+            return
+        count_run("fragment")
 
-left_sp, form_col, right_sp = st.columns([1, 2, 1], gap="large")
-with form_col:
     st.markdown('<div class="card">', unsafe_allow_html=True)
 
-    nombre = st.text_input("Nombre", value="", key="rsvp_nombre")
+    if guest:
+        lugares = "1 lugar reservado" if guest.seats == 1 else f"{guest.seats} lugares reservados"
+        st.caption(f"Invitación para **{guest.name}** · {lugares}")
 
     asistencia = st.selectbox(
         "¿Asistirás?",
-        ["Selecciona una opción", "Sí", "No"],
+        ASISTENCIA_OPTS,
         index=0,
         key="rsvp_asistencia",
     )
 
-    personas = st.selectbox(
-        "¿Cuántas personas asistirán?",
-        ["Selecciona el número de personas"] + [str(i) for i in range(1, 11)],
-        index=0,
-        disabled=(asistencia != "Sí"),
-        key="rsvp_personas",
-    )
+    with st.form("rsvp_form"):
+        nombre = st.text_input("Nombre", value=guest.name if guest else "", key="rsvp_nombre")
 
-    comentarios = st.text_area(
-        "Comentarios y Felicitaciones",
-        value="",
-        height=140,
-        key="rsvp_comentarios",
-    )
+        personas = st.selectbox(
+            "¿Cuántas personas asistirán?",
+            [PERSONAS_PLACEHOLDER] + [str(i) for i in range(1, (guest.seats if guest else PERSONAS_MAX) + 1)],
+            index=0,
+            disabled=(asistencia != "Sí"),
+            key="rsvp_personas",
+        )
+
+        comentarios = st.text_area(
+            "Comentarios y Felicitaciones",
+            value="",
+            height=140,
+            key="rsvp_comentarios",
+        )
 
-    confirmar = st.button("Confirmar", key="rsvp_confirmar")
+        confirmar = st.form_submit_button("Confirmar", key="rsvp_confirmar")
 
     if confirmar:
         if not nombre.strip():
             st.warning("Por favor escribe tu nombre.")
-        elif asistencia == "Selecciona una opción":
+        elif asistencia == ASISTENCIA_OPTS[0]:
             st.warning("Por favor selecciona si asistirás.")
-        elif asistencia == "Sí" and personas == "Selecciona el número de personas":
+        elif asistencia == "Sí" and personas == PERSONAS_PLACEHOLDER:
             st.warning("Por favor selecciona el número de personas.")
         else:
             n_personas = int(personas) if asistencia == "Sí" else 0
-
-            msg = (
-                f"Hola! Soy {nombre.strip()}. "
-                f"\nConfirmación de asistencia a su boda: {asistencia} . "
-                f"\nPersonas: {n_personas}."
+            rsvp = Rsvp(
+                name=nombre.strip(),
+                attendance=asistencia,
+                guests=n_personas,
+                comments=comentarios.strip(),
+                session_id=session_id(),
+                created_at=time.time(),
+                event=ev.slug,
+                token=guest.token if guest else "",
             )
-            if comentarios.strip():
-                msg += f"\n\nComentarios: {comentarios.strip()}"
-
-            link = wa_link(WHATSAPP_E164, msg)
+            # A double click / resent form is answered as if it went through, but stored once.
+            # The fingerprint is only recorded once the RSVP is queued, so a
+            # throttled submit retried later is not mistaken for a duplicate.
+            limiter = shared(rate_limiter)
+            fingerprint = (client_id(), ev.slug, rsvp.token, rsvp.name.casefold(), asistencia, n_personas, rsvp.comments)
+            if not limiter.duplicate(fingerprint):
+                if throttled("submit"):
+                    st.warning("Recibimos demasiadas confirmaciones desde aquí. Intenta de nuevo en un minuto.")
+                    st.markdown("</div>", unsafe_allow_html=True)
+                    return
+                rsvp_store().add(rsvp)
+                limiter.remember(fingerprint)
+
+            msg = rsvp_message(nombre, asistencia, n_personas, comentarios)
+            link = wa_link(ev.whatsapp_e164, msg)
             st.success("Listo ✅ Ahora para terminar abre WhatsApp y manda el mensaje de confirmación prellenado:")
             st.link_button("Abrir WhatsApp", link, use_container_width=True)
 
     st.markdown("</div>", unsafe_allow_html=True)
 
+
 # =========================================================
 # GALLERY SLIDER (✅ carousel)  ✅ MOVED: right after RSVP
 # =========================================================
-if gal_uris:
+@compiled
+def gallery_html(ev: Event) -> str:
     slides = "".join(
         f"""
-        <div class="slide">
-          <img src="{u}" />
-        </div>
+        <div class="slide"{placeholder_style(p)}><template>{picture_html(p, GALLERY_SIZES, 'alt=""')}</template></div>
         """
-        for u in gal_uris
+        for p in ev.gallery()
     )
 
-    gallery_html = f"""
-    <style>
-      html, body {{ margin:0; padding:0; }}
-
-      .wrap {{
-        width: 100%;
-        max-width: 860px;
-        margin: 0 auto;
-        position: relative;
-        overflow: visible;
-      }}
-
-      .viewport {{
-        width: 100%;
-        height: clamp(320px, 50vw, 560px);
-        border-radius: 16px;
-        overflow: hidden;
-        box-shadow: 0 16px 34px rgba(0,0,0,0.30);
-        background: rgba(0,0,0,0.18);
-        position: relative;
-        z-index: 1;
-      }}
-
-      .track {{
-        display: flex;
-        width: 100%;
-        height: 100%;
-        transition: transform 420ms ease;
-        will-change: transform;
-      }}
-
-      .slide {{
-        flex: 0 0 100%;
-        width: 100%;
-        height: 100%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-      }}
-
-      .slide img {{
-        width: 100%;
-        height: 100%;
-        object-fit: contain;
-        object-position: center;
-        display: block;
-      }}
-
-      .navbtn {{
-        position: absolute;
-        top: 50%;
-        transform: translateY(-50%);
-        width: 48px; height: 48px;
-        border-radius: 999px;
-        border: none;
-        cursor: pointer;
-        background: rgba(0,0,0,0.55);
-        color: white;
-        font-size: 26px;
-        z-index: 99999;
-      }}
-      .prev {{ left: 18px; }}
-      .next {{ right: 18px; }}
-
-      .dots {{
-        display:flex;
-        justify-content:center;
-        gap: 8px;
-        margin-top: 12px;
-      }}
-
-      .dot {{
-        width: 8px; height: 8px;
-        border-radius: 999px;
-        background: rgba(255,255,255,0.45);
-        cursor:pointer;
-      }}
-
-      .dot.active {{
-        background: rgba(255,255,255,0.95);
-      }}
-    </style>
-
-    <div class="wrap">
+    return f"""
+
+    <div class="wrap" data-inv="gallery">
       <div class="viewport">
         <div class="track" id="track">
           {slides}
@@ -1181,85 +2514,438 @@ if gal_uris:
       <div class="dots" id="dots"></div>
     </div>
 
-    <script>
-      const track = document.getElementById("track");
-      const slideEls = Array.from(track.querySelectorAll(".slide"));
-      const dotsDiv = document.getElementById("dots");
-      const prevBtn = document.getElementById("prevBtn");
-      const nextBtn = document.getElementById("nextBtn");
-
-      let idx = 0;
-
-      function renderDots() {{
-        dotsDiv.innerHTML = "";
-        slideEls.forEach((_, i) => {{
-          const d = document.createElement("div");
-          d.className = "dot" + (i === idx ? " active" : "");
-          d.onclick = () => {{
-            idx = i;
-            render();
-          }};
-          dotsDiv.appendChild(d);
-        }});
-      }}
-
-      function render() {{
-        track.style.transform = `translateX(${{-idx * 100}}%)`;
-        renderDots();
-      }}
-
-      function move(step) {{
-        if (slideEls.length === 0) return;
-        idx = (idx + step + slideEls.length) % slideEls.length;
-        render();
-      }}
-
-      prevBtn.onclick = () => move(-1);
-      nextBtn.onclick = () => move(1);
-
-      document.addEventListener("keydown", (e) => {{
-        if (e.key === "ArrowLeft") move(-1);
-        if (e.key === "ArrowRight") move(1);
-      }});
-
-      render();
-    </script>
     """
 
-    st.markdown(
-        f"""
+
+@compiled
+def thanks_html(ev: Event) -> str:
+    return f"""
 <div class="section">
-  <div class="h-serif small-center" style="margin-top: 10px; font-size:20px;">{THANKS_TEXT}</div>
+  <div class="h-serif small-center" style="margin-top: 10px; font-size:20px;">{ev.thanks_text}</div>
 </div>
-""",
-        unsafe_allow_html=True,
-    )
-    # ✅ HEIGHT=540 + AUTO_RESIZE_SCRIPT
-    # Safe height for mobile (prevents gap) but tall enough for desktop (prevents cropping)
-    components.html(gallery_html + AUTO_RESIZE_SCRIPT, height=540)
-else:
-    st.markdown(
-        """
+"""
+
+
+def gallery_empty_html() -> str:
+    return """
 <div class="section">
   <div class="h-serif small-center" style="font-size:40px; font-weight:600;">Galería</div>
   <div class="small-center p-muted" style="margin-top: 10px;">
     Agrega fotos en /assets con nombres como: gallery1.jpg / gallery2.png / gallery3.jpeg ...
   </div>
 </div>
-""",
-        unsafe_allow_html=True,
-    )
+"""
 
 # =========================================================
 # FOOTER
 # =========================================================
-st.markdown(
-    f"""
+def footer_html(ev: Event) -> str:
+    return f"""
 <div class="section small-center" style="padding: 8px 16px;">
-  <div class="p-muted">{FOOTER_LINE_1}</div>
-  <div class="h-serif" style="font-size:22px; font-weight:600;">{FOOTER_LINE_2}</div>
+  <div class="p-muted">{ev.footer_line_1}</div>
+  <div class="h-serif" style="font-size:22px; font-weight:600;">{ev.footer_line_2}</div>
   <div style="margin-top:10px; opacity:0.6; font-size:12px;">© {datetime.now().year}</div>
 </div>
-""",
-    unsafe_allow_html=True,
-)
\ No newline at end of file
+"""
+
+
+# =========================================================
+# Metrics (Prometheus text format)
+# INVITACION_METRICS=9464 (or host:port, [::1]:port) serves /metrics there,
+# INVITACION_METRICS=/path/invitacion.prom rewrites that file every few
+# seconds (node_exporter textfile collector). Unset, every section() is a
+# shared pass-through object and nothing is measured.
+# =========================================================
+METRICS_TARGET = os.environ.get("INVITACION_METRICS", "")
+METRICS_FILE_INTERVAL = 15.0
+METRICS_SESSION_WINDOW = 300     # a session is "active" if it ran in the last 5 minutes
+METRICS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+METRICS_COUNTERS = {"hits", "misses", "refreshes", "evictions", "run", "submit", "duplicate"}   # in stats() dicts
+
+
+class Metrics:
+    """Per-section render time / bytes, runs and sessions; rendered as Prometheus text."""
+
+    def __init__(self, sources: dict[str, Callable[[], dict[str, int]]]) -> None:
+        self.sources = sources          # name -> stats() of another singleton, read at scrape time
+        self._sections: dict[str, list] = {}    # name -> [bucket counts, sum s, count, bytes total, last bytes]
+        self._runs: dict[str, int] = {}
+        self._sessions: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    def run(self, kind: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._runs[kind] = self._runs.get(kind, 0) + 1
+            self._sessions.pop(session_id(), None)
+            self._sessions[session_id()] = now
+            while self._sessions and now - next(iter(self._sessions.values())) > METRICS_SESSION_WINDOW:
+                self._sessions.popitem(last=False)
+
+    def observe(self, section: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            rec = self._sections.get(section)
+            if rec is None:
+                rec = self._sections[section] = [[0] * len(METRICS_BUCKETS), 0.0, 0, 0, 0]
+            for i, le in enumerate(METRICS_BUCKETS):
+                if seconds <= le:
+                    rec[0][i] += 1
+            rec[1] += seconds
+            rec[2] += 1
+            rec[3] += nbytes
+            rec[4] = nbytes
+
+    def render(self) -> str:
+        with self._lock:
+            sections = {k: (list(v[0]), *v[1:]) for k, v in sorted(self._sections.items())}
+            runs = dict(self._runs)
+            now = time.monotonic()
+            active = sum(1 for t in self._sessions.values() if now - t <= METRICS_SESSION_WINDOW)
+
+        lines = [
+            "# HELP invitacion_section_seconds Time to build and emit one section of the page.",
+            "# TYPE invitacion_section_seconds histogram",
+        ]
+        for name, (buckets, total, count, _, _) in sections.items():
+            for le, n in zip(METRICS_BUCKETS, buckets):
+                lines.append(f'invitacion_section_seconds_bucket{{section="{name}",le="{le}"}} {n}')
+            lines.append(f'invitacion_section_seconds_bucket{{section="{name}",le="+Inf"}} {count}')
+            lines.append(f'invitacion_section_seconds_sum{{section="{name}"}} {total:.6f}')
+            lines.append(f'invitacion_section_seconds_count{{section="{name}"}} {count}')
+        lines += [
+            "# HELP invitacion_section_bytes_total HTML bytes emitted per section.",
+            "# TYPE invitacion_section_bytes_total counter",
+            *(f'invitacion_section_bytes_total{{section="{k}"}} {v[3]}' for k, v in sections.items()),
+            "# HELP invitacion_section_bytes HTML bytes of the last render of each section.",
+            "# TYPE invitacion_section_bytes gauge",
+            *(f'invitacion_section_bytes{{section="{k}"}} {v[4]}' for k, v in sections.items()),
+            "# HELP invitacion_runs_total Script runs (full page or RSVP fragment only).",
+            "# TYPE invitacion_runs_total counter",
+            *(f'invitacion_runs_total{{kind="{k}"}} {v}' for k, v in sorted(runs.items())),
+            "# HELP invitacion_active_sessions Sessions that ran in the last 5 minutes.",
+            "# TYPE invitacion_active_sessions gauge",
+            f"invitacion_active_sessions {active}",
+        ]
+        for source, stats in self.sources.items():
+            for key, value in stats().items():
+                if key in METRICS_COUNTERS:
+                    metric, kind = f"invitacion_{source}_{key}_total", "counter"
+                else:
+                    metric, kind = f"invitacion_{source}_{key}", "gauge"
+                lines += [f"# TYPE {metric} {kind}", f"{metric} {value}"]
+        return "\n".join(lines) + "\n"
+
+    # ---- exporters ----
+    def serve(self, host: str, port: int) -> None:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            address_family = socket.AF_INET6 if ":" in host else socket.AF_INET
+
+        self._server = Server((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+
+    def write_every(self, path: Path, interval: float) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)     # fail here, not silently in the thread
+
+        def loop() -> None:
+            while True:
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                try:
+                    tmp.write_text(self.render(), encoding="utf-8")
+                    os.replace(tmp, path)
+                except OSError as err:
+                    print(f"[metrics] could not write {path}: {err}")
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name="metrics-file", daemon=True).start()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def metrics_endpoint(target: str) -> tuple[str, int] | None:
+    """(host, port) when `target` is "9464", ":9464", "host:9464" or "[::1]:9464"; None for a file path."""
+    if "/" in target or os.sep in target:
+        return None
+    host, _, port = target.rpartition(":")
+    if not port.isdigit():
+        return None
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+@st.cache_resource(show_spinner=False, on_release=Metrics.close)
+def metrics() -> Metrics:
+    m = Metrics({
+        "asset_cache": asset_cache().stats,
+        "asset_manifest": asset_manifest().stats,
+        "events": event_registry().stats,
+        "rate_limited": rate_limiter().stats,
+    })
+    endpoint = metrics_endpoint(METRICS_TARGET)
+    # A taken port or an unwritable directory must not take the page down with
+    # it: warn and keep counting in-process only.
+    if endpoint:
+        host, port = endpoint
+        url = f"http://{f'[{host}]' if ':' in host else host}:{port}/metrics"
+        try:
+            m.serve(host, port)
+            print(f"[metrics] serving {url}")
+        except OSError as err:
+            print(f"[metrics] WARNING: could not listen on {url}: {err}; exporter disabled")
+    else:
+        path = Path(METRICS_TARGET).resolve()
+        try:
+            m.write_every(path, METRICS_FILE_INTERVAL)
+            print(f"[metrics] writing {path} every {METRICS_FILE_INTERVAL}s")
+        except OSError as err:
+            print(f"[metrics] WARNING: cannot write {path}: {err}; exporter disabled")
+    return m
+
+
+class Section:
+    """Times one section of main() and counts the HTML it emits (see section())."""
+
+    __slots__ = ("name", "nbytes", "t0")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.nbytes = 0
+
+    def __enter__(self) -> Section:
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        shared(metrics).observe(self.name, time.perf_counter() - self.t0, self.nbytes)
+
+    def markdown(self, html: str) -> None:
+        st.markdown(html, unsafe_allow_html=True)
+        self.nbytes += len(html.encode("utf-8"))
+
+    def component(self, html: str, ev: Event, **kwargs) -> None:
+        self.nbytes += len(html.encode("utf-8"))
+        invitation_component(html, ev, **kwargs)
+
+
+class _Unmeasured:
+    """section() when metrics are off: same interface, no bookkeeping."""
+
+    def __enter__(self) -> _Unmeasured:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def markdown(self, html: str) -> None:
+        st.markdown(html, unsafe_allow_html=True)
+
+    def component(self, html: str, ev: Event, **kwargs) -> None:
+        invitation_component(html, ev, **kwargs)
+
+
+_UNMEASURED = _Unmeasured()
+
+
+def section(name: str) -> Section | _Unmeasured:
+    return Section(name) if METRICS_TARGET else _UNMEASURED
+
+
+def count_run(kind: str) -> None:
+    if METRICS_TARGET:
+        shared(metrics).run(kind)
+
+
+# =========================================================
+# Admin (?admin, same ?e= as the invitation)
+# Headcount for the couple. Each event opens with the `admin_password` in
+# its event.toml; the INVITACION_ADMIN_PASSWORD environment variable (or
+# `admin_password` in .streamlit/secrets.toml) is the default event's
+# password and also opens every other event (for whoever hosts the app).
+# Without any, the page stays disabled.
+# =========================================================
+def admin_password() -> str:
+    """The host's password (environment / secrets.toml)."""
+    try:
+        secret = st.secrets.get("admin_password", "")
+    except Exception:   # no secrets.toml
+        secret = ""
+    return os.environ.get("INVITACION_ADMIN_PASSWORD", "") or str(secret)
+
+
+def admin_page(ev: Event) -> None:
+    st.markdown(global_css(ev), unsafe_allow_html=True)
+    st.title(f"Confirmaciones · {ev.couple_1} & {ev.couple_2}")
+
+    accepted = [p.encode("utf-8") for p in (ev.admin_password, admin_password()) if p]
+    if not accepted:
+        st.info("El panel está desactivado: define admin_password en event.toml (o INVITACION_ADMIN_PASSWORD).")
+        return
+    ok_key = f"admin_ok:{ev.slug}"     # logging into one event doesn't open the others
+    if not st.session_state.get(ok_key):
+        with st.form("admin_login"):
+            password = st.text_input("Contraseña", type="password", key="admin_password").encode("utf-8")
+            if st.form_submit_button("Entrar"):
+                if any([hmac.compare_digest(password, p) for p in accepted]):
+                    st.session_state[ok_key] = True
+                    st.rerun()
+                st.error("Contraseña incorrecta.")
+        return
+
+    summary = rsvp_store().summary(ev.slug)
+    yes_n, yes_seats = summary["totals"].get("Sí", (0, 0))
+    no_n, _ = summary["totals"].get("No", (0, 0))
+    guests = guest_index().guests(ev.guest_list)
+    pending = sum(1 for token in guests if token not in summary["answered"])
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Asistirán", yes_n)
+    c2.metric("No asistirán", no_n)
+    c3.metric("Pendientes", pending if guests else "—", help=None if guests else "Sin lista de invitados")
+    c4.metric("Lugares confirmados", yes_seats)
+
+    if summary["daily"]:
+        days = sorted({d for d, *_ in summary["daily"]})
+        series = {att: [0] * len(days) for att in ("Sí", "No")}
+        for day, att, n, _ in summary["daily"]:
+            series.setdefault(att, [0] * len(days))[days.index(day)] += n
+        st.subheader("Confirmaciones por día")
+        st.bar_chart({"día": days, **series}, x="día", y=list(series))
+
+    limits = rate_limiter().stats()
+    if len(limits) > 1:
+        st.caption("Solicitudes rechazadas: " + ", ".join(f"{k} {v}" for k, v in limits.items() if k != "buckets"))
+
+    st.subheader("Últimas respuestas")
+    if not summary["latest"]:
+        st.caption("Todavía no hay respuestas.")
+        return
+    # A table, not markdown: names and comments are typed by guests.
+    st.dataframe(
+        [
+            {
+                "Fecha": datetime.fromtimestamp(created_at).strftime("%d/%m %H:%M"),
+                "Nombre": name,
+                "Asistencia": att,
+                "Personas": n if att == "Sí" else None,
+                "Comentarios": comments,
+            }
+            for created_at, name, att, n, comments in summary["latest"]
+        ],
+        hide_index=True,
+    )
+
+
+# =========================================================
+# Page
+# =========================================================
+def main() -> None:
+    _run_singletons.clear()
+    slug = st.query_params.get("e", "")
+    try:
+        ev = event_registry().get(slug)
+    except ValueError as err:
+        ev, problem = None, f"La invitación «{slug}» no se pudo cargar: {err}"
+    else:
+        problem = "No encontramos esta invitación. Revisa el enlace que te enviaron."
+    if ev is None:
+        st.set_page_config(page_title="Invitación", page_icon="💍", layout="wide")
+        st.error(problem)
+        return
+
+    st.set_page_config(page_title=f"{ev.couple_1} & {ev.couple_2}", page_icon="💍", layout="wide")
+
+    if throttled("run"):
+        st.warning("Demasiadas solicitudes seguidas. Espera unos segundos y recarga la página.")
+        return
+
+    if "admin" in st.query_params:
+        admin_page(ev)
+        return
+
+    count_run("full")
+
+    with section("global_css") as sec:
+        sec.markdown(global_css(ev))
+
+    # HERO (music starts on the first tap)
+    with section("hero") as sec:
+        if not ev.hero_img:
+            st.error(f"Missing hero image. Add one of: {ev.assets.name}/hero.jpg | hero.jpeg | hero.png | hero.webp")
+        else:
+            # ✅ NO CHANGE to HERO height (avoids deletion issue)
+            sec.component(hero_html(ev), ev, key="inv_hero", height=600)
+
+    with section("intro") as sec:
+        sec.markdown(intro_html(ev))
+
+    # STORY + CALENDAR + COUNTDOWN (center)
+    colL, colC, colR = st.columns([1.2, 1.0, 1.2], vertical_alignment="center", gap="large")
+    with colL, section("story_left") as sec:
+        if ev.story_left_img:
+            sec.markdown(story_html(ev.story_left_img))
+        else:
+            st.info("Add story_left.jpg/.jpeg/.png/.webp in assets/")
+    with colC, section("countdown") as sec:
+        # Auto-resizes to its content; also runs the scroll reveal for the page
+        sec.component(countdown_html(ev), ev, key="inv_countdown", reveal=True)
+    with colR, section("story_right") as sec:
+        if ev.story_right_img:
+            sec.markdown(story_html(ev.story_right_img))
+        else:
+            st.info("Add story_right.jpg/.jpeg/.png/.webp in assets/")
+
+    with section("parents") as sec:
+        sec.markdown(parents_html(ev))
+
+    with st.container(), section("ceremony") as sec:
+        sec.markdown(ceremony_html(ev))
+
+    with section("dress_code") as sec:
+        sec.markdown(dress_code_html(ev))
+    with section("gifts") as sec:
+        sec.markdown(gifts_html(ev))
+
+    with section("rsvp") as sec:
+        sec.markdown(rsvp_title_html(ev))
+        left_sp, form_col, right_sp = st.columns([1, 2, 1], gap="large")
+        with form_col:
+            guest = guest_index().lookup(ev.guest_list, st.query_params.get("g", ""))
+            rsvp_form(ev, guest)
+
+    # GALLERY right after RSVP
+    with section("gallery") as sec:
+        if ev.gallery():
+            sec.markdown(thanks_html(ev))
+            sec.component(gallery_html(ev), ev, key="inv_gallery")
+        else:
+            sec.markdown(gallery_empty_html())
+
+    with section("footer") as sec:
+        sec.markdown(footer_html(ev))
+
+
+# Under Streamlit the block at the top runs the module copy instead; this is
+# for bare `python invitacion.py`. Importing it (export_static.py) only
+# defines the builders.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Encode the responsive images of the invitation ahead of time.
+
+    python prebuild_assets.py [SLUG ...] [--all]     (default: the default event)
+
+The app encodes the AVIF/WebP copies of each photo in the background the
+first time it is shown and serves the original until they exist. Run this
+after adding photos (or as a deploy step) so no visitor ever gets the
+originals. Files already in static/derived/ are reused.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import invitacion as inv
+
+
+def event_slugs() -> list[str]:
+    """Every servable event folder (names starting with "_" are never served)."""
+    if not inv.EVENTS_DIR.is_dir():
+        return []
+    return sorted(
+        d.name for d in inv.EVENTS_DIR.iterdir()
+        if (d / "event.toml").is_file() and inv.EVENT_SLUG.fullmatch(d.name)
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("slugs", nargs="*", metavar="SLUG", help="events/<SLUG>/ (omit for the default event)")
+    ap.add_argument("--all", action="store_true", help="the default event and every event in events/")
+    args = ap.parse_args()
+
+    slugs = ["", *event_slugs()] if args.all else (args.slugs or [""])
+    if inv.Image is None:
+        raise SystemExit("Pillow is not installed: the app serves the original files")
+    for slug in slugs:
+        ev = inv.event_registry().get(slug)
+        if ev is None:
+            raise SystemExit(f"no event {slug!r} in {inv.EVENTS_DIR}")
+        t0 = time.perf_counter()
+        n = inv.prebuild_images(ev)
+        print(f"{slug or '(default)'}: {n} photo(s) in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Serve an exported invitation (export_static.py) with its precompressed files.
+
+    python serve_static.py [DIR] [--port 8000] [--bind 127.0.0.1]
+
+For each request the .br or .gz that the export wrote next to the file is
+sent when the browser accepts it (Content-Encoding + Vary: Accept-Encoding);
+nothing is compressed per request. Hashed files (name.<hash>.ext) are
+cached for a year, index.html is revalidated every time. Range requests
+are answered for uncompressed files (the song). Any server that can do
+the same works too, e.g. nginx with `gzip_static on;` and `brotli_static on;`.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+from email.utils import formatdate
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ENCODINGS = ((".br", "br"), (".gz", "gzip"))     # preferred first
+HASHED = re.compile(r"\.[0-9a-f]{10}\.[^.]+$")
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+TYPES = {
+    ".webmanifest": "application/manifest+json",
+    ".woff2": "font/woff2",
+    ".avif": "image/avif",
+    ".webp": "image/webp",
+    ".opus": "audio/ogg",
+    ".m4a": "audio/mp4",
+}
+
+
+def accepted(header: str) -> set[str]:
+    """Codings with q > 0 in an Accept-Encoding header."""
+    out = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        q = re.search(r"q=([0-9.]+)", params)
+        if name and (not q or float(q.group(1)) > 0):
+            out.add(name.strip().lower())
+    return out
+
+
+class Handler(SimpleHTTPRequestHandler):
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, **TYPES}
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_file() or path.suffix in (".gz", ".br") or path.name.startswith("."):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+
+        body, coding = path, None
+        codings = accepted(self.headers.get("Accept-Encoding", ""))
+        for suffix, name in ENCODINGS:
+            candidate = path.with_name(path.name + suffix)
+            if name in codings and candidate.is_file():
+                body, coding = candidate, name
+                break
+
+        stat = body.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._common_headers(path, etag)
+            self.end_headers()
+            return None
+
+        start, end = 0, stat.st_size - 1
+        status = HTTPStatus.OK
+        m = RANGE.match(self.headers.get("Range", "")) if coding is None else None
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start, end = int(m.group(1)), min(int(m.group(2) or end), end)
+            else:   # suffix range: last N bytes
+                start = max(0, stat.st_size - int(m.group(2)))
+            if start > end:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{stat.st_size}")
+                self.end_headers()
+                return None
+            status = HTTPStatus.PARTIAL_CONTENT
+
+        fh = body.open("rb")
+        fh.seek(start)
+        self.send_response(status)
+        self._common_headers(path, etag)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        if coding:
+            self.send_header("Content-Encoding", coding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        self.end_headers()
+        self._remaining = end - start + 1
+        return fh
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_remaining", None)
+        while remaining is None or remaining > 0:
+            chunk = source.read(1 << 16 if remaining is None else min(1 << 16, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+
+    def _common_headers(self, path: Path, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        if any(path.with_name(path.name + suffix).is_file() for suffix, _ in ENCODINGS):
+            self.send_header("Vary", "Accept-Encoding")
+        if HASHED.search(path.name):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("dir", nargs="?", default="dist", type=Path, help="exported site (default: dist/)")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--bind", default="127.0.0.1")
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.bind, args.port), partial(Handler, directory=str(args.dir)))
+    print(f"Serving {args.dir} on http://{args.bind}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from guest_links import issue_tokens  # noqa: E402
+from invitacion import read_guests  # noqa: E402
+
+CSV = 'nombre,lugares,token\nAna,2,tok1\nPérez, Luis,3,tok2\n"Ríos, Eva",1,tok3\n'
+
+
+def test_read_guests_ignores_fields_past_the_header(tmp_path, capsys):
+    path = tmp_path / "guests.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    guests = read_guests(path)
+
+    assert set(guests) == {"tok1", "tok3"}      # line 3 is shifted: its token column holds "3"
+    assert guests["tok3"].name == "Ríos, Eva"
+    assert f"{path}:3:" in capsys.readouterr().out
+
+
+def test_issue_tokens_refuses_rows_past_the_header(tmp_path):
+    path = tmp_path / "guests.csv"
+    path.write_text(CSV, encoding="utf-8")
+
+    with pytest.raises(SystemExit, match="line\\(s\\) 3 "):
+        issue_tokens(path)
+    assert path.read_text(encoding="utf-8") == CSV     # not rewritten
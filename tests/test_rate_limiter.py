@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from invitacion import RateLimiter  # noqa: E402
+
+LIMITS = {"submit": {"session": (1, 0.0), "client": (10, 0.0)}}
+KEYS = {"session": "s1", "client": "127.0.0.1"}
+FINGERPRINT = ("127.0.0.1", "", "", "ana", "Sí", 2, "")
+
+
+def test_throttled_submit_is_not_remembered_as_duplicate():
+    limiter = RateLimiter(LIMITS)
+    assert limiter.allow("submit", KEYS)
+    limiter.remember(("other",))
+
+    # Throttled: nothing stored, so nothing is remembered either
+    assert not limiter.duplicate(FINGERPRINT)
+    assert not limiter.allow("submit", KEYS)
+
+    # The retry must not be swallowed as a duplicate
+    assert not limiter.duplicate(FINGERPRINT)
+
+
+def test_remembered_submit_is_duplicate_within_window():
+    limiter = RateLimiter(LIMITS)
+    assert not limiter.duplicate(FINGERPRINT)
+    limiter.remember(FINGERPRINT)
+    assert limiter.duplicate(FINGERPRINT)
+    assert not limiter.duplicate(FINGERPRINT, window=0)
+    assert limiter.stats()["duplicate"] == 1
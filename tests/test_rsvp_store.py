@@ -0,0 +1,23 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from invitacion import Rsvp, RsvpStore  # noqa: E402
+
+
+def rsvp(name: str, guests=2) -> Rsvp:
+    return Rsvp(name=name, attendance="Sí", guests=guests, comments="", session_id="s1", created_at=time.time())
+
+
+def test_bad_batch_is_counted_and_writer_keeps_going(tmp_path):
+    store = RsvpStore(tmp_path / "rsvp.sqlite3")
+    store.add(rsvp("ana", guests=object()))     # sqlite3 can't bind it
+    assert store.flush(timeout=10)
+    store.add(rsvp("luis"))
+    assert store.flush(timeout=10)
+    store.close()
+
+    assert store.failed == 1
+    assert store.written == 1